@@ -0,0 +1,139 @@
+import os
+import pickle
+import zlib
+from concurrent.futures import ThreadPoolExecutor
+import pygame
+from config import *
+from render_cache import FROG_ROTATIONS, atlas_from_rotations
+
+IMAGES_DIR = "images"
+CACHE_DIR = ".asset_cache"
+CACHE_FILE = "sprites.bin"
+CACHE_VERSION = 2
+CAR_DIRECTIONS = {1: -90, -1: 90}
+
+
+class AssetPipeline:
+    # Scaled and rotated sprites are cached on disk as zlib-compressed RGBA
+    # pixels, keyed by the source files' mtimes and the grid settings. A cold start
+    # decodes the PNGs in parallel and writes the cache; a warm start only
+    # reads it. Surfaces are created on first use, so the menu only pays for
+    # the road.
+
+    def __init__(self, image_dir=IMAGES_DIR, cache_dir=CACHE_DIR):
+        self.image_dir = image_dir
+        self.cache_path = os.path.join(cache_dir, CACHE_FILE)
+        self._pixels = None
+        self._surfaces = {}
+        self._car_sprites = None
+        self._frog_atlas = None
+
+    def road(self):
+        return self._surface("road")
+
+    def frog_rotations(self):
+        return {direction: self._surface("frog/" + direction) for direction in FROG_ROTATIONS}
+
+    def frog_atlas(self):
+        if self._frog_atlas is None:
+            self._frog_atlas = atlas_from_rotations(self.frog_rotations())
+        return self._frog_atlas
+
+    def car_sprites(self):
+        # One {direction: sprite} dict per car image, already turned to face
+        # its driving direction.
+        if self._car_sprites is None:
+            self._car_sprites = [
+                {direction: self._surface(f"car/{name}/{direction}") for direction in CAR_DIRECTIONS}
+                for name in self.car_files()
+            ]
+        return self._car_sprites
+
+    def _surface(self, name):
+        surface = self._surfaces.get(name)
+        if surface is None:
+            size, data = self._load()[name]
+            surface = pygame.image.frombytes(zlib.decompress(data), size, "RGBA").convert_alpha()
+            self._surfaces[name] = surface
+        return surface
+
+    def car_files(self):
+        return sorted(
+            file for file in os.listdir(self.image_dir)
+            if file.startswith("car") and file.endswith(".png")
+        )
+
+    def _sources(self):
+        return ["frog.png", "road.png"] + self.car_files()
+
+    def _cache_key(self):
+        mtimes = tuple(
+            (file, os.path.getmtime(os.path.join(self.image_dir, file)))
+            for file in self._sources()
+        )
+        return (CACHE_VERSION, GRID_SIZE, FROG_SIZE, SCREEN_WIDTH, SCREEN_HEIGHT, mtimes)
+
+    def _load(self):
+        if self._pixels is not None:
+            return self._pixels
+        key = self._cache_key()
+        try:
+            with open(self.cache_path, "rb") as file:
+                cached_key, pixels = pickle.load(file)
+            if cached_key == key:
+                self._pixels = pixels
+                return pixels
+        except (OSError, pickle.UnpicklingError, EOFError, ValueError):
+            pass
+
+        self._pixels = self._build()
+        try:
+            os.makedirs(os.path.dirname(self.cache_path), exist_ok=True)
+            temp_path = self.cache_path + ".tmp"
+            with open(temp_path, "wb") as file:
+                pickle.dump((key, self._pixels), file, protocol=pickle.HIGHEST_PROTOCOL)
+            os.replace(temp_path, self.cache_path)
+        except OSError:
+            # Read-only checkout: the sprites are built, only the next start
+            # pays for decoding them again.
+            pass
+        return self._pixels
+
+    def _build(self):
+        jobs = [(_prepare_frog, "frog.png"), (_prepare_road, "road.png")]
+        jobs += [(_prepare_car, file) for file in self.car_files()]
+        pixels = {}
+        with ThreadPoolExecutor() as pool:
+            futures = [
+                pool.submit(prepare, os.path.join(self.image_dir, file), file)
+                for prepare, file in jobs
+            ]
+            for future in futures:
+                for name, surface in future.result():
+                    data = zlib.compress(pygame.image.tobytes(surface, "RGBA"), 1)
+                    pixels[name] = (surface.get_size(), data)
+        return pixels
+
+
+def _prepare_frog(path, file):
+    image = pygame.transform.scale(pygame.image.load(path), (FROG_SIZE, FROG_SIZE))
+    return [
+        ("frog/" + direction, pygame.transform.rotate(image, angle))
+        for direction, angle in FROG_ROTATIONS.items()
+    ]
+
+
+def _prepare_road(path, file):
+    image = pygame.image.load(path)
+    return [("road", pygame.transform.scale(image, (SCREEN_WIDTH, SCREEN_HEIGHT)))]
+
+
+def _prepare_car(path, file):
+    image = pygame.image.load(path)
+    img_width, img_height = image.get_size()
+    scale = min(GRID_SIZE / img_width, GRID_SIZE / img_height)
+    image = pygame.transform.scale(image, (int(img_width * scale), int(img_height * scale)))
+    return [
+        (f"car/{file}/{direction}", pygame.transform.rotate(image, angle))
+        for direction, angle in CAR_DIRECTIONS.items()
+    ]
@@ -0,0 +1,204 @@
+import argparse
+import json
+import os
+import random
+import time
+from collections import Counter
+from multiprocessing import Pool
+from config import *
+from simulation import Simulation, SPEED_MULTIPLIERS, DEFAULT_CAR_SIZES, pixel
+
+DEFAULT_MAX_STEPS = 60 * SIM_HZ
+DEFAULT_CHUNK_SIZE = 200
+LOOKAHEAD_STEPS = 12
+
+
+def random_policy(sim, rng):
+    return rng.choice([None, None, "up", "up", "down", "left", "right"])
+
+
+def up_policy(sim, rng):
+    return "up"
+
+
+def safe_policy(sim, rng):
+    # Hop up only if no car will cover the next cell in the coming steps.
+    x, y, width, height = sim.frog.rect
+    target = (x, y - GRID_SIZE, width, height)
+    for step in range(1, LOOKAHEAD_STEPS + 1):
+        if _predict_hit(sim, target, step):
+            return None
+    return "up"
+
+
+def _predict_hit(sim, rect, steps):
+    x, y, width, height = rect
+    lane = sim.lane_index.lanes.get(y // GRID_SIZE, [])
+    for car in lane:
+        car_x = pixel(car.x + car.speed * car.direction * steps)
+        if x < car_x + car.width and car_x < x + width:
+            return True
+    return False
+
+
+POLICIES = {
+    "random": random_policy,
+    "up": up_policy,
+    "safe": safe_policy,
+}
+
+
+def run_episode(difficulty, policy, seed, max_steps=DEFAULT_MAX_STEPS,
+                car_sizes=DEFAULT_CAR_SIZES):
+    # car_sizes defaults to the two bundled sprites, while the game picks
+    # from every car sprite it loads; pass the game's sizes (for example
+    # from a recording) to measure rates on the same car mix players get.
+    sim = Simulation(difficulty, seed, car_sizes)
+    rng = random.Random(seed)
+    choose = POLICIES[policy]
+    while not sim.finished and sim.frame < max_steps:
+        sim.step(choose(sim, rng))
+    return {
+        "difficulty": difficulty,
+        "policy": policy,
+        "seed": seed,
+        "won": sim.won,
+        "collision": sim.game_over,
+        "steps": sim.frame,
+    }
+
+
+class EpisodeStats:
+    # Running totals that merge across workers; time-to-win is kept as a
+    # histogram of step counts so percentiles stay exact in bounded memory.
+
+    def __init__(self):
+        self.episodes = 0
+        self.wins = 0
+        self.collisions = 0
+        self.steps = 0
+        self.win_steps = Counter()
+
+    def add(self, record):
+        self.episodes += 1
+        self.steps += record["steps"]
+        if record["won"]:
+            self.wins += 1
+            self.win_steps[record["steps"]] += 1
+        elif record["collision"]:
+            self.collisions += 1
+
+    def merge(self, other):
+        self.episodes += other.episodes
+        self.wins += other.wins
+        self.collisions += other.collisions
+        self.steps += other.steps
+        self.win_steps.update(other.win_steps)
+
+    def percentile(self, fraction):
+        if not self.wins:
+            return None
+        rank = fraction * (self.wins - 1)
+        seen = 0
+        for steps in sorted(self.win_steps):
+            seen += self.win_steps[steps]
+            if seen > rank:
+                return steps / SIM_HZ
+        return None
+
+    def summary(self):
+        timeouts = self.episodes - self.wins - self.collisions
+        win_seconds = sum(s * n for s, n in self.win_steps.items()) / SIM_HZ
+        return {
+            "episodes": self.episodes,
+            "win_rate": self.wins / self.episodes if self.episodes else 0.0,
+            "collision_rate": self.collisions / self.episodes if self.episodes else 0.0,
+            "timeout_rate": timeouts / self.episodes if self.episodes else 0.0,
+            "mean_time_to_win": win_seconds / self.wins if self.wins else None,
+            "median_time_to_win": self.percentile(0.5),
+            "p90_time_to_win": self.percentile(0.9),
+        }
+
+
+def _run_chunk(job):
+    difficulty, policy, seeds, max_steps, car_sizes, keep_records = job
+    stats = EpisodeStats()
+    records = []
+    for seed in seeds:
+        record = run_episode(difficulty, policy, seed, max_steps, car_sizes)
+        stats.add(record)
+        if keep_records:
+            records.append(record)
+    return difficulty, policy, stats, records
+
+
+def _jobs(difficulties, policies, episodes, seed_start, chunk_size, max_steps, car_sizes,
+          keep_records):
+    for difficulty in difficulties:
+        for policy in policies:
+            for start in range(seed_start, seed_start + episodes, chunk_size):
+                end = min(start + chunk_size, seed_start + episodes)
+                yield (difficulty, policy, range(start, end), max_steps, car_sizes,
+                       keep_records)
+
+
+def run_batch(difficulties, policies, episodes, seed_start=0, workers=None,
+              chunk_size=DEFAULT_CHUNK_SIZE, max_steps=DEFAULT_MAX_STEPS, output=None,
+              car_sizes=DEFAULT_CAR_SIZES):
+    # Episodes are fanned out in seed chunks so each task is large enough to
+    # amortise inter-process overhead. Per-episode records, if requested,
+    # are appended to `output` as JSON lines as chunks complete.
+    results = {}
+    jobs = _jobs(difficulties, policies, episodes, seed_start, chunk_size, max_steps,
+                 list(car_sizes), output is not None)
+    out = open(output, "w", encoding="utf-8") if output else None
+    try:
+        with Pool(workers) as pool:
+            for difficulty, policy, stats, records in pool.imap_unordered(_run_chunk, jobs):
+                results.setdefault((difficulty, policy), EpisodeStats()).merge(stats)
+                if out:
+                    for record in records:
+                        out.write(json.dumps(record) + "\n")
+    finally:
+        if out:
+            out.close()
+    return results
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Run headless Frogger episodes in parallel.")
+    parser.add_argument("--difficulty", nargs="+", default=["medium"],
+                        choices=sorted(SPEED_MULTIPLIERS))
+    parser.add_argument("--policy", nargs="+", default=["safe"], choices=sorted(POLICIES))
+    parser.add_argument("--episodes", type=int, default=1000)
+    parser.add_argument("--seed-start", type=int, default=0)
+    parser.add_argument("--workers", type=int, default=os.cpu_count())
+    parser.add_argument("--chunk-size", type=int, default=DEFAULT_CHUNK_SIZE)
+    parser.add_argument("--max-steps", type=int, default=DEFAULT_MAX_STEPS)
+    parser.add_argument("--output", help="write one JSON line per episode to this file")
+    parser.add_argument("--car-sizes-from", metavar="RECORDING",
+                        help="use the car sizes stored in a game recording instead of "
+                             "the two bundled sprites")
+    args = parser.parse_args()
+
+    car_sizes = DEFAULT_CAR_SIZES
+    if args.car_sizes_from:
+        from replay import load_recording
+        car_sizes = load_recording(args.car_sizes_from)[2]
+
+    started = time.perf_counter()
+    results = run_batch(
+        args.difficulty, args.policy, args.episodes, args.seed_start, args.workers,
+        args.chunk_size, args.max_steps, args.output, car_sizes,
+    )
+    elapsed = time.perf_counter() - started
+
+    total = 0
+    for (difficulty, policy), stats in sorted(results.items()):
+        total += stats.episodes
+        print(json.dumps({"difficulty": difficulty, "policy": policy, **stats.summary()}))
+    print(f"{total} episodes in {elapsed:.2f}s ({total / elapsed:.0f} episodes/s)")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,181 @@
+import argparse
+import json
+import os
+import random
+import time
+from config import *
+from simulation import Simulation, CarState, LANES
+from spatial import LaneIndex
+
+DEFAULT_SCALES = [25, 100, 1000, 10000]
+REPEATS = 200
+REGRESSION_THRESHOLD = 1.2
+# The batch benchmark runs up to BATCH_GAMES games of num_cars cars each,
+# fewer at large scales so games * cars stays within BATCH_CELLS.
+BATCH_GAMES = 1000
+BATCH_CELLS = 1000000
+
+
+def scaled_simulation(num_cars, seed=0):
+    # The medium layout with num_cars spread over the regular lanes.
+    sim = Simulation("medium", seed)
+    rng = random.Random(seed)
+    sim.cars = []
+    for i in range(num_cars):
+        row, base_speed, direction = LANES[i % len(LANES)]
+        width, height = rng.choice(sim.car_sizes)
+        sim.cars.append(CarState(
+            rng.uniform(0, SCREEN_WIDTH), row * GRID_SIZE, base_speed * 0.6, direction,
+            width, height,
+        ))
+    sim.lane_index = LaneIndex(sim.cars)
+    # Park the frog in a car lane so collision queries do real work.
+    sim.frog.y = LANES[0][0] * GRID_SIZE
+    return sim
+
+
+def measure(func, repeats=REPEATS):
+    # Median and p95 of single calls, in microseconds.
+    samples = []
+    for _ in range(repeats):
+        start = time.perf_counter()
+        func()
+        samples.append(time.perf_counter() - start)
+    samples.sort()
+    return {
+        "median_us": samples[len(samples) // 2] * 1e6,
+        "p95_us": samples[int(len(samples) * 0.95)] * 1e6,
+    }
+
+
+def bench_update(num_cars):
+    sim = scaled_simulation(num_cars)
+    return measure(sim.update)
+
+
+def bench_collisions(num_cars):
+    sim = scaled_simulation(num_cars)
+    return measure(sim.check_collisions)
+
+
+def bench_render(num_cars):
+    # Renders onto an off-screen surface through the dummy SDL driver, with
+    # plain surfaces standing in for the sprites.
+    os.environ.setdefault("SDL_VIDEODRIVER", "dummy")
+    try:
+        import pygame
+    except ImportError:
+        return None
+    from entities import Frog, Car
+    from graphics import draw_game, DirtyRectRenderer
+    from render_cache import build_frog_atlas
+
+    pygame.init()
+    screen = pygame.display.set_mode((SCREEN_WIDTH, SCREEN_HEIGHT))
+    road_image = pygame.Surface((SCREEN_WIDTH, SCREEN_HEIGHT))
+    car_sprites = [
+        {1: pygame.Surface(size), -1: pygame.Surface(size)}
+        for size in Simulation().car_sizes
+    ]
+    frog_atlas = build_frog_atlas(pygame.Surface((FROG_SIZE, FROG_SIZE)))
+
+    sim = scaled_simulation(num_cars)
+    frog = Frog(sim.frog)
+    cars = [Car(state, car_sprites) for state in sim.cars]
+    renderer = DirtyRectRenderer()
+
+    def full():
+        draw_game(screen, road_image, frog, cars, False, False, frog_atlas)
+
+    def dirty():
+        sim.update()
+        renderer.draw(screen, road_image, frog, cars, False, False, frog_atlas)
+
+    return {"full": measure(full), "dirty": measure(dirty)}
+
+
+def bench_batch(num_cars):
+    try:
+        import numpy as np
+        from vector_sim import BatchSimulation, CarArrays
+    except ImportError:
+        return None
+    # Every game starts from the scaled layout; the car arrays of one game
+    # are repeated rather than rebuilt per game from Python objects.
+    games = max(1, min(BATCH_GAMES, BATCH_CELLS // num_cars))
+    sim = scaled_simulation(num_cars)
+    cars = CarArrays.from_simulations([sim])
+    batch = BatchSimulation("medium", range(games))
+    batch.cars = CarArrays(*(
+        np.repeat(column, games, axis=0)
+        for column in (cars.x, cars.lane, cars.speed, cars.direction, cars.width, cars.height)
+    ))
+    batch.frog_x[:] = sim.frog.x
+    batch.frog_y[:] = sim.frog.y
+    actions = np.zeros(games, dtype=np.int64)
+    return measure(lambda: batch.step(actions), repeats=50)
+
+
+BENCHMARKS = {
+    "update": bench_update,
+    "collisions": bench_collisions,
+    "render": bench_render,
+    "batch": bench_batch,
+}
+
+
+def run(scales, names):
+    results = {}
+    for name in names:
+        for scale in scales:
+            result = BENCHMARKS[name](scale)
+            if result is None:
+                continue
+            if "median_us" in result:
+                result = {"": result}
+            for variant, numbers in result.items():
+                key = name + ("." + variant if variant else "") + f"[{scale}]"
+                results[key] = numbers
+    return results
+
+
+def compare(results, baseline, threshold=REGRESSION_THRESHOLD):
+    regressions = []
+    for key, numbers in results.items():
+        if key in baseline:
+            ratio = numbers["median_us"] / baseline[key]["median_us"]
+            if ratio > threshold:
+                regressions.append((key, ratio))
+    return regressions
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Headless Frogger benchmarks.")
+    parser.add_argument("--scale", type=int, nargs="+", default=DEFAULT_SCALES,
+                        help="car counts to benchmark")
+    parser.add_argument("--only", nargs="+", choices=sorted(BENCHMARKS),
+                        default=list(BENCHMARKS))
+    parser.add_argument("--save", help="write results to this JSON file")
+    parser.add_argument("--compare", help="baseline JSON file to check for regressions")
+    args = parser.parse_args()
+
+    results = run(args.scale, args.only)
+    for key, numbers in results.items():
+        print(f"{key:<32} median {numbers['median_us']:10.1f} us   "
+              f"p95 {numbers['p95_us']:10.1f} us")
+
+    if args.save:
+        with open(args.save, "w", encoding="utf-8") as file:
+            json.dump(results, file, indent=2)
+
+    if args.compare:
+        with open(args.compare, encoding="utf-8") as file:
+            regressions = compare(results, json.load(file))
+        for key, ratio in regressions:
+            print(f"REGRESSION {key}: {ratio:.2f}x slower than baseline")
+        if regressions:
+            raise SystemExit(1)
+
+
+if __name__ == "__main__":
+    main()
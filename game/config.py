@@ -8,4 +8,19 @@ FROG_SIZE = GRID_SIZE
 
 # Colors
 WHITE = (255, 255, 255)
-BLACK = (0, 0, 0)
\ No newline at end of file
+BLACK = (0, 0, 0)
+
+# Rendering
+DIRTY_RECTS = True  # Only repaint the regions sprites moved through
+RENDER_FPS = 60  # Frame cap while playing, 0 for uncapped
+MENU_FPS = 60
+PROFILE_OVERLAY = False  # Frame timing overlay, toggled with F3 in game
+
+# Simulation (car speeds are in pixels per step)
+SIM_HZ = 60
+SIM_STEP = 1.0 / SIM_HZ
+MAX_STEPS_PER_FRAME = 5  # Beyond this the game slows down instead of stalling
+
+# Recording
+RECORD_SESSIONS = False  # Save seed and inputs of each game for replay.py
+RECORDINGS_DIR = "recordings"
\ No newline at end of file
@@ -1,58 +1,57 @@
 import pygame
-import random
-from config import *
+from simulation import FrogState, pixel
+
+# Pygame views over the simulation state: they own the sprites and rects
+# used for drawing, while positions live in simulation.FrogState/CarState.
 
 class Frog:
-    def __init__(self):
-        self.x = GRID_WIDTH // 2 * GRID_SIZE
-        self.y = (GRID_HEIGHT - 1) * GRID_SIZE
-        self.rect = pygame.Rect(self.x, self.y, FROG_SIZE, FROG_SIZE)
-        self.direction = "up"
+    def __init__(self, state=None):
+        self.state = state or FrogState()
+
+    @property
+    def x(self):
+        return self.state.x
+
+    @property
+    def y(self):
+        return self.state.y
+
+    @property
+    def direction(self):
+        return self.state.direction
+
+    @property
+    def rect(self):
+        return pygame.Rect(self.state.rect)
 
     def move(self, dx, dy):
-        new_x = self.x + dx * GRID_SIZE
-        new_y = self.y + dy * GRID_SIZE
-        if 0 <= new_x < SCREEN_WIDTH and 0 <= new_y < SCREEN_HEIGHT:
-            self.x = new_x
-            self.y = new_y
-            self.rect.topleft = (self.x, self.y)
-            if dx == 1:
-                self.direction = "right"
-            elif dx == -1:
-                self.direction = "left"
-            elif dy == -1:
-                self.direction = "up"
-            elif dy == 1:
-                self.direction = "down"
-
-    def draw(self, screen, frog_image):
-        rotation_angles = {"up": 0, "right": -90, "down": 180, "left": 90}
-        angle = rotation_angles[self.direction]
-        rotated_frog = pygame.transform.rotate(frog_image, angle)
-        rotated_rect = rotated_frog.get_rect(center=self.rect.center)
-        screen.blit(rotated_frog, rotated_rect)
+        self.state.move(dx, dy)
+
+    def draw(self, screen, frog_atlas):
+        sprite, (dx, dy) = frog_atlas[self.direction]
+        screen.blit(sprite, (self.x + dx, self.y + dy))
 
 class Car:
-    def __init__(self, x, y, speed, direction, car_images):
-        self.x = x
-        self.y = y
-        self.speed = speed
-        self.direction = direction
-        base_image = random.choice(car_images)
-        self.image = pygame.transform.rotate(base_image, -90 if direction == 1 else 90)
-        img_width, img_height = self.image.get_size()
-        self.rect = pygame.Rect(
-            x, y + (GRID_SIZE - img_height) // 2, img_width, img_height
-        )
+    def __init__(self, state, car_sprites):
+        self.state = state
+        self.image = car_sprites[state.sprite][state.direction]
+
+    @property
+    def rect(self):
+        return pygame.Rect(self.state.rect)
+
+    def render_rect(self, alpha=1.0):
+        # Position between the last two simulation steps; alpha is how far
+        # the render time is into the next step. A car that just wrapped
+        # around the screen is drawn where it is now.
+        state = self.state
+        x, y, width, height = state.rect
+        if abs(state.x - state.prev_x) <= state.speed + 1:
+            x = pixel(state.prev_x + (state.x - state.prev_x) * alpha)
+        return pygame.Rect(x, y, width, height)
 
     def move(self):
-        self.x += self.speed * self.direction
-        self.rect.x = self.x
-        if self.direction == 1 and self.x > SCREEN_WIDTH:
-            self.x = -self.rect.width
-        elif self.direction == -1 and self.x < -self.rect.width:
-            self.x = SCREEN_WIDTH
-        self.rect.x = self.x
-
-    def draw(self, screen):
-        screen.blit(self.image, self.rect)
\ No newline at end of file
+        self.state.move()
+
+    def draw(self, screen, alpha=1.0):
+        screen.blit(self.image, self.render_rect(alpha))
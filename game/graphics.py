@@ -1,25 +1,16 @@
 import pygame
-import os
 import sys
 from config import *
+from assets import AssetPipeline
+from render_cache import blit_text, get_font
 
 def load_images():
-    car_images = []
+    # Returns the asset pipeline once the road, needed by the first menu
+    # frame, is available. Other sprites are created on first use.
+    assets = AssetPipeline()
     try:
-        frog_img = pygame.image.load("images/frog.png").convert_alpha()
-        frog_img = pygame.transform.scale(frog_img, (FROG_SIZE, FROG_SIZE))
-        for file in os.listdir("images"):
-            if file.startswith("car") and file.endswith(".png"):
-                img = pygame.image.load(os.path.join("images", file)).convert_alpha()
-                img_width, img_height = img.get_size()
-                scale = min(GRID_SIZE / img_width, GRID_SIZE / img_height)
-                new_width = int(img_width * scale)
-                new_height = int(img_height * scale)
-                img = pygame.transform.scale(img, (new_width, new_height))
-                car_images.append(img)
-        road_img = pygame.image.load("images/road.png").convert_alpha()
-        road_img = pygame.transform.scale(road_img, (SCREEN_WIDTH, SCREEN_HEIGHT))
-    except pygame.error as e:
+        assets.road()
+    except (pygame.error, OSError) as e:
         print(f"Error loading images: {e}")
         print(
             "Please ensure frog.png, car*.png, and road.png are in the images/ folder."
@@ -27,48 +18,99 @@ def load_images():
         pygame.quit()
         sys.exit()
 
-    if not car_images:
+    if not assets.car_files():
         print("No car images found. Ensure files are named car1.png, car2.png, etc.")
         pygame.quit()
         sys.exit()
 
-    return frog_img, car_images, road_img
+    return assets
 
-def draw_game(screen, road_image, frog, cars, game_over, won, frog_image):
+def draw_game(screen, road_image, frog, cars, game_over, won, frog_atlas, alpha=1.0):
     screen.blit(road_image, (0, 0))
     for car in cars:
-        car.draw(screen)
-    frog.draw(screen, frog_image)
+        car.draw(screen, alpha)
+    frog.draw(screen, frog_atlas)
 
-    font_sub = pygame.font.SysFont(None, 40)
-    pulse = 5 * abs((pygame.time.get_ticks() // 100 % 10) - 5)
+    if not game_over and not won:
+        return
 
+    pulse = 5 * abs((pygame.time.get_ticks() // 100 % 10) - 5)
     if game_over:
-        game_over_font = pygame.font.SysFont(None, 80 + pulse)
-        game_over_text = game_over_font.render("Game Over!", True, (255, 0, 0))
-        restart_text = font_sub.render(
-            "Press R to Restart, ESC to return to Menu", True, WHITE
-        )
-        game_over_rect = game_over_text.get_rect(
-            center=(SCREEN_WIDTH // 2, SCREEN_HEIGHT // 2 - 40)
-        )
-        restart_rect = restart_text.get_rect(
-            center=(SCREEN_WIDTH // 2, SCREEN_HEIGHT // 2 + 20)
-        )
-        screen.blit(game_over_text, game_over_rect)
-        screen.blit(restart_text, restart_rect)
-
-    elif won:
-        win_font = pygame.font.SysFont(None, 80 + pulse)
-        win_text = win_font.render("You Win!", True, (0, 255, 0))
-        restart_text = font_sub.render(
-            "Press R to Restart, ESC to return to Menu", True, WHITE
-        )
-        win_rect = win_text.get_rect(
-            center=(SCREEN_WIDTH // 2, SCREEN_HEIGHT // 2 - 40)
-        )
-        restart_rect = restart_text.get_rect(
-            center=(SCREEN_WIDTH // 2, SCREEN_HEIGHT // 2 + 20)
-        )
-        screen.blit(win_text, win_rect)
-        screen.blit(restart_text, restart_rect)
\ No newline at end of file
+        title, color = "Game Over!", (255, 0, 0)
+    else:
+        title, color = "You Win!", (0, 255, 0)
+    blit_text(
+        screen, title, 80 + pulse, color,
+        center=(SCREEN_WIDTH // 2, SCREEN_HEIGHT // 2 - 40),
+    )
+    blit_text(
+        screen, "Press R to Restart, ESC to return to Menu", 40, WHITE,
+        center=(SCREEN_WIDTH // 2, SCREEN_HEIGHT // 2 + 20),
+    )
+
+
+class DirtyRectRenderer:
+    # Repaints only the regions the sprites covered last frame and cover
+    # now, and returns them for pygame.display.update(). Returns None when
+    # the whole screen was drawn and needs a full flip.
+
+    def __init__(self):
+        self.previous = []
+        self.full_redraw = True
+
+    def invalidate(self):
+        self.full_redraw = True
+
+    def add_overlay(self, rects):
+        # Regions drawn over the game this frame; restored on the next one.
+        self.previous.extend(rects)
+
+    def draw(self, screen, road_image, frog, cars, game_over, won, frog_atlas, alpha=1.0):
+        current = [car.render_rect(alpha) for car in cars]
+        current.append(frog.rect)
+
+        # The end-of-game overlay pulses across the middle of the screen.
+        if self.full_redraw or game_over or won:
+            draw_game(screen, road_image, frog, cars, game_over, won, frog_atlas, alpha)
+            self.previous = current
+            self.full_redraw = game_over or won
+            return None
+
+        for rect in self.previous:
+            screen.blit(road_image, rect, rect)
+        for car, rect in zip(cars, current):
+            screen.blit(car.image, rect)
+        frog.draw(screen, frog_atlas)
+
+        dirty = self.previous + current
+        self.previous = current
+        return dirty
+
+
+class ProfilerOverlay:
+    # FPS and per-phase p50/p95 in the top-left corner. The text changes
+    # every frame, so it is re-rendered a few times per second and the
+    # surfaces are reused in between.
+
+    REFRESH_MS = 250
+
+    def __init__(self, profiler):
+        self.profiler = profiler
+        self.lines = []
+        self.rendered_at = -self.REFRESH_MS
+
+    def draw(self, screen):
+        now = pygame.time.get_ticks()
+        if now - self.rendered_at >= self.REFRESH_MS:
+            self.rendered_at = now
+            font = get_font(22)
+            texts = [f"FPS {self.profiler.fps():.0f}"]
+            for phase, (p50, p95, p99) in self.profiler.report().items():
+                texts.append(f"{phase:<10} {p50:5.2f} / {p95:5.2f} ms")
+            self.lines = [font.render(text, True, WHITE, BLACK) for text in texts]
+        rects = []
+        y = 5
+        for line in self.lines:
+            rects.append(screen.blit(line, (5, y)))
+            y += line.get_height()
+        return rects
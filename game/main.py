@@ -1,10 +1,15 @@
 import pygame
+import os
 import sys
+import time
+from collections import deque
 from config import *
-from entities import Frog, Car
-from game_logic import initialize_game, check_collisions, check_win
-from graphics import load_images, draw_game
+from game_logic import initialize_game
+from graphics import load_images, draw_game, DirtyRectRenderer, ProfilerOverlay
 from menu import draw_menu, draw_pause_menu
+from render_cache import preload
+from replay import Recorder
+from profiler import FrameProfiler
 
 pygame.init()
 
@@ -14,25 +19,50 @@ clock = pygame.time.Clock()
 
 # Load images
 try:
-    frog_image, car_images, road_image = load_images()
+    assets = load_images()
 except SystemExit:
     sys.exit()
+road_image = assets.road()
+preload()
+
+def start_recording(recorder, sim):
+    if recorder:
+        recorder.close()
+    if not RECORD_SESSIONS:
+        return None
+    os.makedirs(RECORDINGS_DIR, exist_ok=True)
+    name = time.strftime("%Y%m%d-%H%M%S") + f"-{sim.difficulty}-{sim.seed}.frec"
+    return Recorder(os.path.join(RECORDINGS_DIR, name), sim)
 
 def main():
     state = "menu"
     selected_difficulty = "medium"
+    sim = None
     frog = None
     cars = []
+    frog_atlas = None
+    actions = deque()
+    recorder = None
     game_over = False
     won = False
     paused = False
     selected_pause_option = "Resume"
+    renderer = DirtyRectRenderer()
+    accumulator = 0.0
+    frame_time = 0.0
+    profiler = FrameProfiler()
+    overlay = ProfilerOverlay(profiler)
+    show_overlay = PROFILE_OVERLAY
 
     running = True
     while running:
+        profiler.start_frame()
         for event in pygame.event.get():
             if event.type == pygame.QUIT:
                 running = False
+            elif event.type == pygame.KEYDOWN and event.key == pygame.K_F3:
+                show_overlay = not show_overlay
+                renderer.invalidate()
             elif event.type == pygame.KEYDOWN:
                 if state == "menu":
                     if event.key == pygame.K_UP:
@@ -45,7 +75,10 @@ def main():
                         selected_difficulty = difficulties[(idx + 1) % len(difficulties)]
                     elif event.key == pygame.K_RETURN:
                         state = "game"
-                        frog, cars = initialize_game(selected_difficulty, car_images)  # Fixed: Added car_images
+                        sim, frog, cars = initialize_game(selected_difficulty, assets.car_sprites())
+                        frog_atlas = assets.frog_atlas()
+                        recorder = start_recording(recorder, sim)
+                        actions.clear()
                         game_over = False
                         won = False
                         paused = False
@@ -73,43 +106,84 @@ def main():
                             selected_pause_option = "Resume"
                         elif not game_over and not won:
                             if event.key == pygame.K_UP:
-                                frog.move(0, -1)
+                                actions.append("up")
                             elif event.key == pygame.K_DOWN:
-                                frog.move(0, 1)
+                                actions.append("down")
                             elif event.key == pygame.K_LEFT:
-                                frog.move(-1, 0)
+                                actions.append("left")
                             elif event.key == pygame.K_RIGHT:
-                                frog.move(1, 0)
+                                actions.append("right")
                         if event.key == pygame.K_r and (game_over or won):
-                            frog, cars = initialize_game(selected_difficulty, car_images)  # Fixed: Added car_images
+                            sim, frog, cars = initialize_game(selected_difficulty, assets.car_sprites())
+                            recorder = start_recording(recorder, sim)
+                            actions.clear()
                             game_over = False
                             won = False
                         elif event.key == pygame.K_ESCAPE and (game_over or won):
                             state = "menu"
 
         if state == "menu":
+            renderer.invalidate()
             draw_menu(screen, selected_difficulty, road_image)
             pygame.display.flip()
-            clock.tick(60)
+            clock.tick(MENU_FPS)
+            accumulator = frame_time = 0.0
             continue
 
         if paused:
-            draw_game(screen, road_image, frog, cars, game_over, won, frog_image)
+            renderer.invalidate()
+            draw_game(screen, road_image, frog, cars, game_over, won, frog_atlas)
             draw_pause_menu(screen, selected_pause_option)
             pygame.display.flip()
-            clock.tick(60)
+            clock.tick(MENU_FPS)
+            accumulator = frame_time = 0.0
             continue
 
+        profiler.mark("events")
+
+        # Fixed-timestep simulation: run as many SIM_STEP steps as the
+        # elapsed real time covers, whatever the render rate is.
         if not game_over and not won:
-            for car in cars:
-                car.move()
-            game_over = check_collisions(frog, cars)
-            won = check_win(frog)
+            accumulator += frame_time
+            steps = 0
+            while accumulator >= SIM_STEP and not (game_over or won):
+                # One queued key press per simulation step.
+                action = actions.popleft() if actions else None
+                if recorder:
+                    recorder.record(sim.frame, action)
+                sim.update(action)
+                profiler.mark("update")
+                game_over, won = sim.resolve()
+                profiler.mark("collisions")
+                accumulator -= SIM_STEP
+                steps += 1
+                if steps == MAX_STEPS_PER_FRAME:
+                    accumulator = 0.0
+                    break
+        alpha = 1.0 if game_over or won else accumulator / SIM_STEP
 
-        draw_game(screen, road_image, frog, cars, game_over, won, frog_image)
-        pygame.display.flip()
-        clock.tick(60)
+        if DIRTY_RECTS:
+            dirty = renderer.draw(screen, road_image, frog, cars, game_over, won, frog_atlas, alpha)
+        else:
+            draw_game(screen, road_image, frog, cars, game_over, won, frog_atlas, alpha)
+            dirty = None
+        if show_overlay:
+            overlay_rects = overlay.draw(screen)
+            renderer.add_overlay(overlay_rects)
+            if dirty is not None:
+                dirty.extend(overlay_rects)
+        profiler.mark("render")
+
+        if dirty is None:
+            pygame.display.flip()
+        else:
+            pygame.display.update(dirty)
+        profiler.mark("flip")
+        profiler.end_frame()
+        frame_time = clock.tick(RENDER_FPS) / 1000.0
 
+    if recorder:
+        recorder.close()
     pygame.quit()
     sys.exit()
 
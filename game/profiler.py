@@ -0,0 +1,53 @@
+import time
+from collections import deque
+
+PHASES = ["events", "update", "collisions", "render", "flip"]
+DEFAULT_WINDOW = 240
+
+
+class FrameProfiler:
+    # Per-phase frame timings over a rolling window. mark(phase) charges the
+    # time since the previous mark to that phase; a phase marked several
+    # times in one frame (several simulation steps) is summed.
+
+    def __init__(self, window=DEFAULT_WINDOW):
+        self.samples = {phase: deque(maxlen=window) for phase in PHASES}
+        self.frame_times = deque(maxlen=window)
+        self.current = dict.fromkeys(PHASES, 0.0)
+        self.frame_start = None
+        self.last_mark = None
+
+    def start_frame(self):
+        now = time.perf_counter()
+        if self.frame_start is not None:
+            self.frame_times.append(now - self.frame_start)
+        self.frame_start = self.last_mark = now
+        for phase in PHASES:
+            self.current[phase] = 0.0
+
+    def mark(self, phase):
+        now = time.perf_counter()
+        self.current[phase] += now - self.last_mark
+        self.last_mark = now
+
+    def end_frame(self):
+        for phase in PHASES:
+            self.samples[phase].append(self.current[phase])
+
+    def percentile(self, phase, fraction):
+        values = sorted(self.samples[phase])
+        if not values:
+            return 0.0
+        return values[min(len(values) - 1, int(fraction * len(values)))]
+
+    def fps(self):
+        if not self.frame_times:
+            return 0.0
+        return len(self.frame_times) / sum(self.frame_times)
+
+    def report(self):
+        # {phase: (p50, p95, p99)} in milliseconds.
+        return {
+            phase: tuple(self.percentile(phase, p) * 1000 for p in (0.5, 0.95, 0.99))
+            for phase in PHASES
+        }
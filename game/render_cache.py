@@ -0,0 +1,68 @@
+import pygame
+from config import *
+
+FROG_ROTATIONS = {"up": 0, "right": -90, "down": 180, "left": 90}
+# draw_game pulses the title between 80 and 105 px in steps of 5.
+PULSE_SIZES = [80 + 5 * step for step in range(6)]
+
+_fonts = {}
+_texts = {}
+_overlays = {}
+
+
+def get_font(size):
+    font = _fonts.get(size)
+    if font is None:
+        font = _fonts[size] = pygame.font.SysFont(None, size)
+    return font
+
+
+def render_text(text, size, color, **position):
+    # Returns the rendered surface and its rect for a single keyword
+    # position (center=..., midtop=...). Both are built once per distinct
+    # text, size, color and position, then reused every frame.
+    key = (text, size, color, tuple(position.items()))
+    cached = _texts.get(key)
+    if cached is None:
+        surface = get_font(size).render(text, True, color)
+        cached = _texts[key] = (surface, surface.get_rect(**position))
+    return cached
+
+
+def blit_text(screen, text, size, color, **position):
+    surface, rect = render_text(text, size, color, **position)
+    screen.blit(surface, rect)
+    return rect
+
+
+def get_overlay(color):
+    overlay = _overlays.get(color)
+    if overlay is None:
+        overlay = _overlays[color] = pygame.Surface(
+            (SCREEN_WIDTH, SCREEN_HEIGHT), pygame.SRCALPHA
+        )
+        overlay.fill(color)
+    return overlay
+
+
+def build_frog_atlas(frog_image):
+    return atlas_from_rotations({
+        direction: pygame.transform.rotate(frog_image, angle)
+        for direction, angle in FROG_ROTATIONS.items()
+    })
+
+
+def atlas_from_rotations(rotations):
+    # One pre-rotated sprite per direction, with the offset from the frog's
+    # top-left that keeps it centred on its grid cell.
+    atlas = {}
+    half = FROG_SIZE // 2
+    for direction, sprite in rotations.items():
+        width, height = sprite.get_size()
+        atlas[direction] = (sprite, (half - width // 2, half - height // 2))
+    return atlas
+
+
+def preload():
+    for size in PULSE_SIZES + [40, 55]:
+        get_font(size)
@@ -0,0 +1,177 @@
+import argparse
+import struct
+import time
+from config import *
+from simulation import Simulation, ACTIONS
+
+MAGIC = b"FRGR"
+FORMAT_VERSION = 1
+SNAPSHOT_INTERVAL = 300
+FLUSH_INTERVAL = 300  # frames between flushes of the recording file
+DIFFICULTIES = ["easy", "medium", "hard"]
+ACTION_CODES = [None] + list(ACTIONS)
+END_CODE = 255
+
+# File layout (little-endian): magic, version, seed, difficulty, number of
+# car sizes, the sizes as (width, height) pairs, then one (frame, action)
+# record per step that had an input. Steps without input are not stored.
+# Closing the recording appends an END_CODE record with the last frame.
+HEADER = struct.Struct("<4sHIBB")
+CAR_SIZE = struct.Struct("<HH")
+INPUT = struct.Struct("<IB")
+
+
+class Recorder:
+    def __init__(self, path, sim):
+        self.sim = sim
+        self.file = open(path, "wb")
+        self.file.write(HEADER.pack(
+            MAGIC, FORMAT_VERSION, sim.seed,
+            DIFFICULTIES.index(sim.difficulty), len(sim.car_sizes),
+        ))
+        for width, height in sim.car_sizes:
+            self.file.write(CAR_SIZE.pack(width, height))
+        self.flushed_frame = 0
+
+    def record(self, frame, action):
+        if action is not None:
+            self.file.write(INPUT.pack(frame, ACTION_CODES.index(action)))
+            # Flush now and then so a crash loses at most a few seconds.
+            if frame - self.flushed_frame >= FLUSH_INTERVAL:
+                self.file.flush()
+                self.flushed_frame = frame
+
+    def close(self):
+        self.file.write(INPUT.pack(self.sim.frame, END_CODE))
+        self.file.close()
+
+
+def load_recording(path):
+    with open(path, "rb") as file:
+        data = file.read()
+    magic, version, seed, difficulty, num_sizes = HEADER.unpack_from(data, 0)
+    if magic != MAGIC or version != FORMAT_VERSION:
+        raise ValueError(f"{path} is not a Frogger recording")
+    offset = HEADER.size
+    car_sizes = []
+    for _ in range(num_sizes):
+        car_sizes.append(CAR_SIZE.unpack_from(data, offset))
+        offset += CAR_SIZE.size
+    inputs = {}
+    end_frame = None
+    # A recording cut off mid-write ends with a partial record; drop it.
+    records = data[offset:]
+    records = records[:len(records) - len(records) % INPUT.size]
+    for frame, code in INPUT.iter_unpack(records):
+        if code == END_CODE:
+            end_frame = frame
+        else:
+            inputs[frame] = ACTION_CODES[code]
+    return DIFFICULTIES[difficulty], seed, car_sizes, inputs, end_frame
+
+
+class Replayer:
+    # Re-runs a recording on a headless Simulation. A state snapshot is kept
+    # every SNAPSHOT_INTERVAL frames, so seek() only replays the frames
+    # between the closest earlier snapshot and the target.
+
+    def __init__(self, path):
+        difficulty, seed, car_sizes, self.inputs, self.end_frame = load_recording(path)
+        if self.end_frame is None:
+            # Not closed cleanly: play up to the last recorded input.
+            self.end_frame = max(self.inputs, default=0) + 1
+        self.sim = Simulation(difficulty, seed, car_sizes)
+        self.snapshots = {0: self.sim.snapshot()}
+
+    @property
+    def frame(self):
+        return self.sim.frame
+
+    @property
+    def finished(self):
+        return self.sim.finished or self.sim.frame >= self.end_frame
+
+    def step(self):
+        if self.sim.frame % SNAPSHOT_INTERVAL == 0:
+            self.snapshots.setdefault(self.sim.frame, self.sim.snapshot())
+        return self.sim.step(self.inputs.get(self.sim.frame))
+
+    def advance(self, frames):
+        for _ in range(frames):
+            if self.finished:
+                break
+            self.step()
+
+    def seek(self, frame):
+        start = max(f for f in self.snapshots if f <= frame)
+        if not (start <= self.sim.frame <= frame):
+            self.sim.restore(self.snapshots[start])
+        self.advance(frame - self.sim.frame)
+
+    def run_to_end(self):
+        while not self.finished:
+            self.step()
+        return self.sim.frame
+
+
+def play(path, speed=1.0, start=0):
+    # Draws the replay in a window at `speed` times real time.
+    import pygame
+    from entities import Frog, Car
+    from graphics import load_images, draw_game
+
+    pygame.init()
+    screen = pygame.display.set_mode((SCREEN_WIDTH, SCREEN_HEIGHT))
+    pygame.display.set_caption("Frogger Replay")
+    clock = pygame.time.Clock()
+    assets = load_images()
+    road_image = assets.road()
+    frog_atlas = assets.frog_atlas()
+
+    replayer = Replayer(path)
+    replayer.seek(start)
+    frog = Frog(replayer.sim.frog)
+    cars = [Car(state, assets.car_sprites()) for state in replayer.sim.cars]
+    steps_per_frame = max(1, round(speed))
+    fps = SIM_HZ * speed / steps_per_frame
+
+    running = True
+    while running:
+        for event in pygame.event.get():
+            if event.type == pygame.QUIT or (
+                event.type == pygame.KEYDOWN and event.key == pygame.K_ESCAPE
+            ):
+                running = False
+        replayer.advance(steps_per_frame)
+        sim = replayer.sim
+        draw_game(screen, road_image, frog, cars, sim.game_over, sim.won, frog_atlas)
+        pygame.display.flip()
+        clock.tick(fps)
+    pygame.quit()
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Replay a recorded Frogger session.")
+    parser.add_argument("path")
+    parser.add_argument("--speed", type=float, default=1.0)
+    parser.add_argument("--start", type=int, default=0, help="frame to start from")
+    parser.add_argument("--headless", action="store_true",
+                        help="run to the end without a window and print the outcome")
+    args = parser.parse_args()
+
+    if not args.headless:
+        play(args.path, args.speed, args.start)
+        return
+
+    replayer = Replayer(args.path)
+    started = time.perf_counter()
+    frames = replayer.run_to_end()
+    elapsed = time.perf_counter() - started
+    sim = replayer.sim
+    outcome = "won" if sim.won else "game over" if sim.game_over else "quit"
+    print(f"{outcome} after {frames} frames, replayed in {elapsed * 1000:.1f} ms "
+          f"({frames / SIM_HZ / elapsed:.0f}x real time)")
+
+
+if __name__ == "__main__":
+    main()
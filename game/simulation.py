@@ -0,0 +1,168 @@
+import random
+from config import *
+from spatial import LaneIndex
+
+SPEED_MULTIPLIERS = {"easy": 0.5, "medium": 0.6, "hard": 0.75}
+CARS_PER_LANE = {"easy": 2, "medium": 3, "hard": 4}
+# (grid row, base speed, direction)
+LANES = [
+    (3, 5, 1),
+    (4, 6, -1),
+    (5, 4, 1),
+    (6, 7, -1),
+    (7, 5, 1),
+]
+# Size of the bundled car and motorcycle sprites once scaled to a grid cell
+# and turned sideways; used when no images are loaded.
+DEFAULT_CAR_SIZES = [(50, 27), (50, 22)]
+ACTIONS = {
+    "up": (0, -1),
+    "down": (0, 1),
+    "left": (-1, 0),
+    "right": (1, 0),
+}
+
+
+def pixel(value):
+    # Rounds a position the way pygame.Rect's attribute setters do, halves
+    # away from zero (2.5 -> 3, -2.5 -> -3); round() would round to even.
+    if value >= 0:
+        return int(value + 0.5)
+    return -int(-value + 0.5)
+
+
+def rects_overlap(a, b):
+    # Same test as pygame.Rect.colliderect for integer (x, y, width, height)
+    # tuples; CarState.rect rounds x with pixel() like the original rects.
+    ax, ay, aw, ah = a
+    bx, by, bw, bh = b
+    return ax < bx + bw and bx < ax + aw and ay < by + bh and by < ay + ah
+
+
+class FrogState:
+    def __init__(self):
+        self.x = GRID_WIDTH // 2 * GRID_SIZE
+        self.y = (GRID_HEIGHT - 1) * GRID_SIZE
+        self.direction = "up"
+
+    @property
+    def rect(self):
+        return (self.x, self.y, FROG_SIZE, FROG_SIZE)
+
+    def move(self, dx, dy):
+        new_x = self.x + dx * GRID_SIZE
+        new_y = self.y + dy * GRID_SIZE
+        if 0 <= new_x < SCREEN_WIDTH and 0 <= new_y < SCREEN_HEIGHT:
+            self.x = new_x
+            self.y = new_y
+            if dx == 1:
+                self.direction = "right"
+            elif dx == -1:
+                self.direction = "left"
+            elif dy == -1:
+                self.direction = "up"
+            elif dy == 1:
+                self.direction = "down"
+
+
+class CarState:
+    def __init__(self, x, y, speed, direction, width, height, sprite=0):
+        self.x = x
+        self.y = y
+        self.speed = speed
+        self.direction = direction
+        self.width = width
+        self.height = height
+        self.sprite = sprite
+        self.prev_x = x
+
+    @property
+    def rect(self):
+        return (pixel(self.x), self.y + (GRID_SIZE - self.height) // 2, self.width, self.height)
+
+    def move(self):
+        self.prev_x = self.x
+        self.x += self.speed * self.direction
+        if self.direction == 1 and self.x > SCREEN_WIDTH:
+            self.x = -self.width
+        elif self.direction == -1 and self.x < -self.width:
+            self.x = SCREEN_WIDTH
+
+
+class Simulation:
+    # The whole game state and rules, with no pygame dependency. One step()
+    # is one frame of the original 60 fps loop.
+
+    def __init__(self, difficulty="medium", seed=None, car_sizes=DEFAULT_CAR_SIZES):
+        self.difficulty = difficulty
+        self.car_sizes = list(car_sizes)
+        self.reset(seed)
+
+    def reset(self, seed=None):
+        self.seed = seed if seed is not None else random.randrange(2 ** 32)
+        self.rng = random.Random(self.seed)
+        self.frog = FrogState()
+        self.cars = []
+        self.game_over = False
+        self.won = False
+        self.frame = 0
+
+        multiplier = SPEED_MULTIPLIERS[self.difficulty]
+        num_cars = CARS_PER_LANE[self.difficulty]
+        for row, base_speed, direction in LANES:
+            x_positions = list(range(0, SCREEN_WIDTH, GRID_SIZE * 2))
+            self.rng.shuffle(x_positions)
+            for i in range(num_cars):
+                if x_positions:
+                    x = x_positions.pop()
+                    sprite = self.rng.randrange(len(self.car_sizes))
+                    width, height = self.car_sizes[sprite]
+                    self.cars.append(CarState(
+                        x, row * GRID_SIZE, base_speed * multiplier, direction,
+                        width, height, sprite,
+                    ))
+        self.lane_index = LaneIndex(self.cars)
+
+    @property
+    def finished(self):
+        return self.game_over or self.won
+
+    def step(self, action=None):
+        if self.finished:
+            return self.game_over, self.won
+        self.update(action)
+        return self.resolve()
+
+    def update(self, action=None):
+        # First half of a step: movement only.
+        if action is not None:
+            self.frog.move(*ACTIONS[action])
+        for car in self.cars:
+            car.move()
+        self.lane_index.update()
+
+    def resolve(self):
+        # Second half of a step: collision and win checks.
+        self.game_over = self.check_collisions()
+        self.won = self.frog.y == 0
+        self.frame += 1
+        return self.game_over, self.won
+
+    def snapshot(self):
+        # Everything step() reads or writes; the layout of the cars is fixed
+        # by the seed, so only their positions change.
+        return (
+            self.frame, self.game_over, self.won,
+            (self.frog.x, self.frog.y, self.frog.direction),
+            [(car.x, car.prev_x) for car in self.cars],
+        )
+
+    def restore(self, snapshot):
+        self.frame, self.game_over, self.won, frog, cars = snapshot
+        self.frog.x, self.frog.y, self.frog.direction = frog
+        for car, (x, prev_x) in zip(self.cars, cars):
+            car.x, car.prev_x = x, prev_x
+        self.lane_index.update()
+
+    def check_collisions(self):
+        return self.lane_index.query(self.frog.rect) is not None
@@ -0,0 +1,45 @@
+from bisect import bisect_left
+from config import *
+
+
+def _car_x(car):
+    return car.x
+
+
+class LaneIndex:
+    # Cars bucketed by the grid row they drive in, each bucket sorted by x.
+    # Cars never change lanes, so a collision query only has to look at the
+    # rows the rect covers and at the cars whose x range can reach it.
+
+    def __init__(self, cars):
+        self.lanes = {}
+        for car in cars:
+            self.lanes.setdefault(car.y // GRID_SIZE, []).append(car)
+        self.max_width = {
+            row: max(car.width for car in lane) for row, lane in self.lanes.items()
+        }
+        self.update()
+
+    def update(self):
+        # Called after the cars move. Only cars that wrapped around the
+        # screen are out of place, so the sort is close to linear.
+        for lane in self.lanes.values():
+            lane.sort(key=_car_x)
+
+    def query(self, rect):
+        x, y, width, height = rect
+        for row in range(y // GRID_SIZE, (y + height - 1) // GRID_SIZE + 1):
+            lane = self.lanes.get(row)
+            if not lane:
+                continue
+            # A car's rect starts at pixel(car.x), at most half a pixel left
+            # of car.x, so nothing left of this bound can reach the rect.
+            start = bisect_left(lane, x - self.max_width[row] - 1, key=_car_x)
+            for car in lane[start:]:
+                if car.x >= x + width:
+                    break
+                car_x, car_y, car_width, car_height = car.rect
+                if (x < car_x + car_width and car_x < x + width
+                        and y < car_y + car_height and car_y < y + height):
+                    return car
+        return None
@@ -0,0 +1,37 @@
+import random
+from config import *
+from simulation import Simulation, rects_overlap
+
+SEEDS = range(40)
+FRAMES = 400
+ACTIONS = [None, None, None, "up", "down", "left", "right"]
+
+
+def test_lane_index_matches_full_scan():
+    # The lane index must find a collision exactly when scanning every car
+    # does, for the frog's cell and for every other cell of the lanes.
+    cells = [
+        (x, y)
+        for y in range(0, SCREEN_HEIGHT, GRID_SIZE)
+        for x in range(0, SCREEN_WIDTH, GRID_SIZE)
+    ]
+    for difficulty in ("easy", "medium", "hard"):
+        rng = random.Random(difficulty)
+        for seed in SEEDS:
+            sim = Simulation(difficulty, seed)
+            while not sim.finished and sim.frame < FRAMES:
+                sim.step(rng.choice(ACTIONS))
+                expected = any(rects_overlap(sim.frog.rect, car.rect) for car in sim.cars)
+                assert sim.game_over == expected, (difficulty, seed, sim.frame)
+                if sim.frame % 10:
+                    continue
+                for x, y in cells:
+                    rect = (x, y, FROG_SIZE, FROG_SIZE)
+                    expected = any(rects_overlap(rect, car.rect) for car in sim.cars)
+                    found = sim.lane_index.query(rect) is not None
+                    assert found == expected, (difficulty, seed, sim.frame, x, y)
+
+
+if __name__ == "__main__":
+    test_lane_index_matches_full_scan()
+    print("ok")
@@ -0,0 +1,73 @@
+import random
+from config import *
+from simulation import LANES, Simulation, rects_overlap
+
+try:
+    from vector_sim import BatchSimulation, action_code
+except ImportError:
+    # NumPy is not installed: vector_sim cannot be used, nothing to check.
+    BatchSimulation = None
+
+SEEDS = range(60)
+FRAMES = 900
+ACTIONS = [None, None, None, "up", "down", "left", "right"]
+
+
+def test_batch_matches_simulation():
+    # BatchSimulation must play every seeded game exactly like Simulation.
+    if BatchSimulation is None:
+        return
+    for difficulty in ("easy", "medium", "hard"):
+        rng = random.Random(difficulty)
+        batch = BatchSimulation(difficulty, SEEDS)
+        sims = [Simulation(difficulty, seed) for seed in SEEDS]
+        for frame in range(FRAMES):
+            actions = [rng.choice(ACTIONS) for _ in sims]
+            batch.step([action_code(action) for action in actions])
+            for sim, action in zip(sims, actions):
+                if not sim.finished:
+                    sim.step(action)
+            for index, sim in enumerate(sims):
+                state = (
+                    bool(batch.game_over[index]), bool(batch.won[index]),
+                    int(batch.frames[index]),
+                    int(batch.frog_x[index]), int(batch.frog_y[index]),
+                )
+                expected = (sim.game_over, sim.won, sim.frame, sim.frog.x, sim.frog.y)
+                assert state == expected, (difficulty, SEEDS[index], frame)
+
+
+def test_overlaps_match_car_rects():
+    # Outcomes alone rarely hit the one-pixel edge cases, so also put a
+    # frog on every cell of every lane each frame and compare the batched
+    # overlap test with the CarState rects.
+    if BatchSimulation is None:
+        return
+    seeds = range(8)
+    cells = [
+        (x, row * GRID_SIZE)
+        for row, _, _ in LANES
+        for x in range(0, SCREEN_WIDTH, GRID_SIZE)
+    ]
+    for difficulty in ("easy", "medium", "hard"):
+        batch = BatchSimulation(difficulty, seeds)
+        sims = [Simulation(difficulty, seed) for seed in seeds]
+        for frame in range(120):
+            batch.cars.move()
+            for sim in sims:
+                for car in sim.cars:
+                    car.move()
+            for x, y in cells:
+                hits = batch.cars.overlaps([x] * len(sims), [y] * len(sims))
+                for index, sim in enumerate(sims):
+                    frog = (x, y, FROG_SIZE, FROG_SIZE)
+                    expected = any(
+                        rects_overlap(frog, car.rect) for car in sim.cars if car.y == y
+                    )
+                    assert bool(hits[index]) == expected, (difficulty, index, frame, x, y)
+
+
+if __name__ == "__main__":
+    test_batch_matches_simulation()
+    test_overlaps_match_car_rects()
+    print("ok")
@@ -0,0 +1,98 @@
+import numpy as np
+from config import *
+from simulation import Simulation, DEFAULT_CAR_SIZES
+
+# Action codes used by BatchSimulation.step; index 0 means "no input".
+ACTION_CODES = [None, "up", "down", "left", "right"]
+ACTION_DX = np.array([0, 0, 0, -1, 1])
+ACTION_DY = np.array([0, -1, 1, 0, 0])
+
+
+def action_code(action):
+    return ACTION_CODES.index(action)
+
+
+class CarArrays:
+    # Structure-of-arrays car state, one row per game and one column per
+    # car: moving, wrapping and overlap tests are whole-array operations.
+
+    def __init__(self, x, lane, speed, direction, width, height):
+        self.x = np.asarray(x, dtype=np.float64)
+        self.lane = np.asarray(lane, dtype=np.int64)
+        self.speed = np.asarray(speed, dtype=np.float64)
+        self.direction = np.asarray(direction, dtype=np.int64)
+        self.width = np.asarray(width, dtype=np.int64)
+        self.height = np.asarray(height, dtype=np.int64)
+        self.top = self.lane * GRID_SIZE + (GRID_SIZE - self.height) // 2
+
+    @classmethod
+    def from_simulations(cls, sims):
+        columns = [
+            [[getattr(car, name) for car in sim.cars] for sim in sims]
+            for name in ("x", "speed", "direction", "width", "height")
+        ]
+        lanes = [[car.y // GRID_SIZE for car in sim.cars] for sim in sims]
+        x, speed, direction, width, height = columns
+        return cls(x, lanes, speed, direction, width, height)
+
+    def move(self, active=None):
+        x = self.x + self.speed * self.direction
+        x = np.where((self.direction == 1) & (x > SCREEN_WIDTH), -self.width, x)
+        x = np.where((self.direction == -1) & (x < -self.width), SCREEN_WIDTH, x)
+        if active is not None:
+            x = np.where(active[:, None], x, self.x)
+        self.x = x
+
+    def overlaps(self, frog_x, frog_y):
+        # Per game: does any car overlap the frog's cell? Car x is rounded
+        # half away from zero like simulation.pixel (np.round rounds to even).
+        car_x = np.sign(self.x) * np.floor(np.abs(self.x) + 0.5)
+        fx = np.asarray(frog_x)[:, None]
+        fy = np.asarray(frog_y)[:, None]
+        hit = (
+            (fx < car_x + self.width) & (car_x < fx + FROG_SIZE)
+            & (fy < self.top + self.height) & (self.top < fy + FROG_SIZE)
+        )
+        return hit.any(axis=1)
+
+
+class BatchSimulation:
+    # Runs many independent games in lockstep. Each game starts exactly as
+    # Simulation(difficulty, seed) would, and stepping all of them is a
+    # handful of NumPy operations regardless of the number of games or cars.
+
+    def __init__(self, difficulty, seeds, car_sizes=DEFAULT_CAR_SIZES):
+        self.difficulty = difficulty
+        self.seeds = list(seeds)
+        sims = [Simulation(difficulty, seed, car_sizes) for seed in self.seeds]
+        self.cars = CarArrays.from_simulations(sims)
+        self.frog_x = np.array([sim.frog.x for sim in sims], dtype=np.int64)
+        self.frog_y = np.array([sim.frog.y for sim in sims], dtype=np.int64)
+        self.game_over = np.zeros(len(sims), dtype=bool)
+        self.won = np.zeros(len(sims), dtype=bool)
+        self.frames = np.zeros(len(sims), dtype=np.int64)
+
+    @property
+    def finished(self):
+        return self.game_over | self.won
+
+    def step(self, actions=None):
+        # actions: one action code per game (see ACTION_CODES), or None.
+        active = ~self.finished
+        if actions is not None:
+            actions = np.asarray(actions)
+            new_x = self.frog_x + ACTION_DX[actions] * GRID_SIZE
+            new_y = self.frog_y + ACTION_DY[actions] * GRID_SIZE
+            valid = (
+                active
+                & (new_x >= 0) & (new_x < SCREEN_WIDTH)
+                & (new_y >= 0) & (new_y < SCREEN_HEIGHT)
+            )
+            self.frog_x = np.where(valid, new_x, self.frog_x)
+            self.frog_y = np.where(valid, new_y, self.frog_y)
+
+        self.cars.move(active)
+        self.game_over |= active & self.cars.overlaps(self.frog_x, self.frog_y)
+        self.won |= active & (self.frog_y == 0)
+        self.frames += active
+        return self.game_over, self.won
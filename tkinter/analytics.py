@@ -0,0 +1,147 @@
+import customtkinter as ctk
+from datetime import date, timedelta
+from decimal import Decimal
+from charts import render_bars
+from storage import next_month
+from tasks import run_in_background
+
+# (caption, number of buckets shown, bar caption format) per rollup.
+BUCKETS = {
+    "day": ("Jours", 30, "%d/%m"),
+    "week": ("Semaines", 12, "%d/%m"),
+    "month": ("Mois", 12, "%m/%y"),
+}
+TOP_LABELS = 5
+
+
+def bucket_starts(bucket, today=None):
+    # First day of each bucket in the window ending with the current one.
+    today = today or date.today()
+    count = BUCKETS[bucket][1]
+    if bucket == "day":
+        return [today - timedelta(days=offset) for offset in range(count - 1, -1, -1)]
+    if bucket == "week":
+        monday = today - timedelta(days=today.weekday())
+        return [monday - timedelta(weeks=offset) for offset in range(count - 1, -1, -1)]
+    starts = [today.replace(day=1)]
+    while len(starts) < count:
+        starts.insert(0, (starts[0] - timedelta(days=1)).replace(day=1))
+    return starts
+
+
+def bucket_end(bucket, start):
+    if bucket == "day":
+        return start + timedelta(days=1)
+    if bucket == "week":
+        return start + timedelta(weeks=1)
+    return next_month(start)
+
+
+def load_analytics(db, bucket, charts, today=None):
+    # Runs on a worker thread. The rollup comes pre-aggregated from the
+    # database; empty buckets are filled with zeros so every chart of a
+    # view has the same bars, and the chart is rendered only if it changed.
+    starts = bucket_starts(bucket, today)
+    end = bucket_end(bucket, starts[-1])
+    totals = dict(db.get_rollup(bucket, starts[0], end))
+    points = [(start, totals.get(start, Decimal(0))) for start in starts]
+    # Weeks and days are listed for the current month, months for all time.
+    period = None if bucket == "month" else starts[-1].replace(day=1)
+    top_labels = db.get_top_labels(period=period, limit=TOP_LABELS)
+    caption = BUCKETS[bucket][2]
+    image = charts.get(
+        bucket,
+        points,
+        lambda points: render_bars(points, [start.strftime(caption) for start, _ in points]),
+    )
+    return points, top_labels, image
+
+
+class AnalyticsWindow(ctk.CTkToplevel):
+    # Spend per day/week/month and top labels. Each reload re-reads the
+    # rollup (cached by the database layer) and reuses the rendered chart
+    # when the numbers for the period are unchanged.
+
+    def __init__(self, master, db, charts, before_query=None, colors=None):
+        super().__init__(master)
+        self.db = db
+        self.charts = charts
+        self.before_query = before_query
+        self.colors = colors or {}
+        self.bucket = "day"
+        self.generation = 0
+        self.title("Analyses")
+        self.geometry("780x520")
+        self.configure(fg_color=self.colors.get("primary", "#0f172a"))
+
+        self.selector = ctk.CTkSegmentedButton(
+            self,
+            values=[caption for caption, _, _ in BUCKETS.values()],
+            command=self.on_select,
+            font=("Roboto", 13),
+        )
+        self.selector.set(BUCKETS[self.bucket][0])
+        self.selector.pack(pady=(20, 10))
+
+        self.chart_label = ctk.CTkLabel(self, text="Chargement...", font=("Roboto", 13))
+        self.chart_label.pack(padx=20, pady=10)
+
+        self.period_label = ctk.CTkLabel(
+            self, text="", font=("Roboto", 13),
+            text_color=self.colors.get("muted", "#94a3b8"),
+        )
+        self.period_label.pack()
+
+        self.top_label = ctk.CTkLabel(
+            self, text="", font=("Roboto", 13), justify="left",
+            text_color=self.colors.get("text", "#f1f5f9"),
+        )
+        self.top_label.pack(padx=20, pady=(10, 20))
+
+        self.refresh()
+
+    def on_select(self, caption):
+        for bucket, (bucket_caption, _, _) in BUCKETS.items():
+            if bucket_caption == caption:
+                self.bucket = bucket
+        self.refresh()
+
+    def refresh(self):
+        self.generation += 1
+        generation = self.generation
+        run_in_background(
+            self,
+            self.query,
+            self.bucket,
+            on_done=lambda result: self.display(generation, result),
+            on_error=lambda error: self.display_error(generation, error),
+        )
+
+    def query(self, bucket):
+        if self.before_query:
+            self.before_query()
+        return bucket, load_analytics(self.db, bucket, self.charts)
+
+    def display(self, generation, result):
+        # Drop results for a view the user has since switched away from.
+        if generation != self.generation or not self.winfo_exists():
+            return
+        bucket, (points, top_labels, image) = result
+        chart = ctk.CTkImage(light_image=image, dark_image=image, size=image.size)
+        self.chart_label.configure(image=chart, text="")
+        self.chart_label.image = chart
+        total = sum(total for _, total in points)
+        self.period_label.configure(
+            text=f"Total sur {len(points)} {BUCKETS[bucket][0].lower()} : {total:.2f} TND"
+        )
+        if top_labels:
+            title = "Top (tout)" if bucket == "month" else "Top (ce mois)"
+            lines = [f"{label} : {amount:.2f} TND" for label, amount in top_labels]
+            self.top_label.configure(text=title + "\n" + "\n".join(lines))
+        else:
+            self.top_label.configure(text="")
+
+    def display_error(self, generation, error):
+        if generation != self.generation or not self.winfo_exists():
+            return
+        self.chart_label.configure(image=None, text=f"Analyse impossible : {error}")
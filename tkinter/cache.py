@@ -0,0 +1,94 @@
+import threading
+import time
+from collections import OrderedDict
+
+DEFAULT_CHECK_INTERVAL = 2.0
+MAX_QUERIES = 64
+
+
+class ExpenseCache:
+    # In-process copy of what the database has returned, tagged with the
+    # data version it was read at. The version is bumped by triggers on every
+    # change to `expenses`, so any change made outside this process shows up
+    # as an unexpected version and drops everything.
+
+    def __init__(self, check_interval=DEFAULT_CHECK_INTERVAL, max_queries=MAX_QUERIES):
+        self.check_interval = check_interval
+        self.max_queries = max_queries
+        self.version = None
+        self.checked_at = 0.0
+        self.rows = {}
+        self.queries = OrderedDict()
+        self.totals = {}
+        self.lock = threading.Lock()
+
+    def needs_check(self):
+        return time.monotonic() - self.checked_at >= self.check_interval
+
+    def validate(self, version):
+        with self.lock:
+            if version != self.version:
+                self._clear()
+                self.version = version
+            self.checked_at = time.monotonic()
+
+    def get_row(self, expense_id):
+        with self.lock:
+            return self.rows.get(expense_id)
+
+    def put_row(self, version, row):
+        with self.lock:
+            if version == self.version:
+                self.rows[row[0]] = row
+
+    def get_query(self, key):
+        with self.lock:
+            rows = self.queries.get(key)
+            if rows is not None:
+                self.queries.move_to_end(key)
+            return rows
+
+    def put_query(self, key, version, rows):
+        with self.lock:
+            if version != self.version:
+                return
+            for row in rows:
+                self.rows[row[0]] = row
+            self.queries[key] = rows
+            if len(self.queries) > self.max_queries:
+                self.queries.popitem(last=False)
+
+    def get_total(self, key):
+        with self.lock:
+            return self.totals.get(key)
+
+    def put_total(self, key, version, value):
+        with self.lock:
+            if version == self.version:
+                self.totals[key] = value
+
+    def after_write(self, before, after, touched=()):
+        # `before` and `after` are the versions read around our own write in
+        # its transaction. If the cache was current when the write started,
+        # only the touched rows and derived results are stale; otherwise
+        # someone else wrote too and nothing cached can be trusted.
+        with self.lock:
+            if self.version is not None and self.version == before:
+                for expense_id in touched:
+                    self.rows.pop(expense_id, None)
+                self.queries.clear()
+                self.totals.clear()
+            else:
+                self._clear()
+            self.version = after
+            self.checked_at = time.monotonic()
+
+    def clear(self):
+        with self.lock:
+            self._clear()
+            self.version = None
+
+    def _clear(self):
+        self.rows.clear()
+        self.queries.clear()
+        self.totals.clear()
@@ -0,0 +1,75 @@
+import threading
+from collections import OrderedDict
+
+MAX_CHARTS = 16
+CHART_SIZE = (720, 300)
+MARGIN = (50, 20, 20, 40)  # left, top, right, bottom
+
+
+class ChartCache:
+    # Rendered charts keyed by view, each stored with the data it was drawn
+    # from. A chart is redrawn only when the rollup for its period changed,
+    # so writes elsewhere in the history leave it cached.
+
+    def __init__(self, max_charts=MAX_CHARTS):
+        self.max_charts = max_charts
+        self.charts = OrderedDict()
+        self.lock = threading.Lock()
+
+    def get(self, key, points, render):
+        points = tuple(points)
+        with self.lock:
+            cached = self.charts.get(key)
+            if cached is not None and cached[0] == points:
+                self.charts.move_to_end(key)
+                return cached[1]
+        image = render(points)
+        with self.lock:
+            self.charts[key] = (points, image)
+            self.charts.move_to_end(key)
+            if len(self.charts) > self.max_charts:
+                self.charts.popitem(last=False)
+        return image
+
+
+def _pillow():
+    try:
+        from PIL import Image, ImageDraw, ImageFont
+    except ImportError:
+        raise RuntimeError("Les graphiques nécessitent Pillow (pip install pillow).")
+    return Image, ImageDraw, ImageFont
+
+
+def render_bars(points, labels, size=CHART_SIZE, background="#1e293b",
+                bar_color="#3b82f6", text_color="#94a3b8"):
+    # points is a list of (bucket, total); labels the caption of each bar.
+    Image, ImageDraw, ImageFont = _pillow()
+    width, height = size
+    left, top, right, bottom = MARGIN
+    image = Image.new("RGB", size, background)
+    draw = ImageDraw.Draw(image)
+    font = ImageFont.load_default()
+
+    plot_width = width - left - right
+    plot_height = height - top - bottom
+    draw.line([(left, top + plot_height), (width - right, top + plot_height)], fill=text_color)
+    if not points:
+        return image
+
+    highest = max(float(total) for bucket, total in points) or 1.0
+    draw.text((4, top - 6), f"{highest:.0f}", fill=text_color, font=font)
+    slot = plot_width / len(points)
+    bar_width = max(1, int(slot * 0.7))
+    # Skip captions so they do not overlap on narrow bars.
+    caption_every = max(1, int(40 // slot) + 1)
+    for index, ((bucket, total), caption) in enumerate(zip(points, labels)):
+        x = left + int(index * slot + (slot - bar_width) / 2)
+        bar_height = int(plot_height * float(total) / highest)
+        if bar_height > 0:
+            draw.rectangle(
+                [x, top + plot_height - bar_height, x + bar_width, top + plot_height],
+                fill=bar_color,
+            )
+        if index % caption_every == 0:
+            draw.text((x, top + plot_height + 6), caption, fill=text_color, font=font)
+    return image
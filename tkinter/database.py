@@ -1,24 +1,113 @@
 import mysql.connector
+import queue
+import threading
+import time
+from contextlib import closing
+from mysql.connector import errors
+from storage import ExpenseStore, like_escape, fulltext_escape, amount_range, date_range
 
-class Database:
-    def __init__(self):
-        self.conn = mysql.connector.connect(
-            host="127.0.0.1",
-            port="3307",
-            user="root",
-            password=""
-        )
-        self.cursor = self.conn.cursor()
-        self.create_database()
-        self.conn.database = "expenses_db"
-        self.create_table()
+DB_CONFIG = {
+    "host": "127.0.0.1",
+    "port": "3307",
+    "user": "root",
+    "password": "",
+    # Fail fast when the server is down instead of blocking startup.
+    "connection_timeout": 5,
+}
+DB_NAME = "expenses_db"
+DEFAULT_POOL_SIZE = 5
+TRIGGERS_VERSION = 2
+ACQUIRE_TIMEOUT = 10.0
+HEALTH_CHECK_INTERVAL = 30.0
+RECONNECT_ATTEMPTS = 3
+
+# Fixed statements run through cached server-side prepared cursors.
+INSERT_EXPENSE = "INSERT INTO expenses (label, amount, date) VALUES (%s, %s, %s)"
+UPDATE_EXPENSE = "UPDATE expenses SET label=%s, amount=%s, date=%s WHERE id=%s"
+DELETE_EXPENSE = "DELETE FROM expenses WHERE id=%s"
+SELECT_EXPENSE = "SELECT * FROM expenses WHERE id=%s"
+SELECT_VERSION = "SELECT version FROM expense_version WHERE id=1"
+LOCK_VERSION = "SELECT version FROM expense_version WHERE id=1 FOR UPDATE"
+SELECT_ALL_EXPENSES = "SELECT * FROM expenses ORDER BY date DESC, id DESC"
+SELECT_TOTAL = "SELECT total FROM expense_summary WHERE month=%s AND label=%s"
+SELECT_YEAR_TOTAL = (
+    "SELECT SUM(total) FROM expense_summary "
+    "WHERE month BETWEEN %s AND %s AND label=%s"
+)
+SELECT_TOP_LABELS = (
+    "SELECT label, total FROM expense_summary "
+    "WHERE month=%s AND label<>'' AND row_count > 0 "
+    "ORDER BY total DESC LIMIT %s"
+)
+# Rollups for the analytics view: days and weeks are grouped on the
+# (date, amount) index, months come straight from expense_summary.
+SELECT_ROLLUPS = {
+    "day": (
+        "SELECT date, SUM(amount) FROM expenses "
+        "WHERE date >= %s AND date < %s GROUP BY date ORDER BY date"
+    ),
+    "week": (
+        "SELECT DATE_SUB(date, INTERVAL WEEKDAY(date) DAY) AS week, SUM(amount) "
+        "FROM expenses WHERE date >= %s AND date < %s GROUP BY week ORDER BY week"
+    ),
+    "month": (
+        "SELECT month, total FROM expense_summary "
+        "WHERE month >= %s AND month < %s AND label='' AND row_count > 0 "
+        "ORDER BY month"
+    ),
+}
+SELECT_FIRST_PAGE = "SELECT * FROM expenses ORDER BY date DESC, id DESC LIMIT %s"
+SELECT_NEXT_PAGE = (
+    "SELECT * FROM expenses WHERE date < %s OR (date = %s AND id < %s) "
+    "ORDER BY date DESC, id DESC LIMIT %s"
+)
+
+
+class Database(ExpenseStore):
+    queries = {
+        "version": SELECT_VERSION,
+        "expense": SELECT_EXPENSE,
+        "total": SELECT_TOTAL,
+        "year_total": SELECT_YEAR_TOTAL,
+        "top_labels": SELECT_TOP_LABELS,
+        **{"rollup_" + bucket: query for bucket, query in SELECT_ROLLUPS.items()},
+    }
+
+    def __init__(self, pool_size=DEFAULT_POOL_SIZE, cache=None, **config):
+        super().__init__(cache)
+        self.config = dict(DB_CONFIG, **config)
+        self.setup_schema()
+        # A plain queue of open connections rather than mysql.connector's
+        # pool: connections keep their session (and the statements prepared
+        # on it) between checkouts, the prepared cursors and health-check
+        # times below are keyed by the connection object itself, and close()
+        # can disconnect every connection it opened.
+        self._statements = {}
+        self._last_used = {}
+        self._lock = threading.Lock()
+        self._connections = []
+        self._idle = queue.LifoQueue()
+        for _ in range(pool_size):
+            conn = mysql.connector.connect(database=DB_NAME, **self.config)
+            self._connections.append(conn)
+            self._idle.put(conn)
+
+    def setup_schema(self):
+        with closing(mysql.connector.connect(**self.config)) as conn:
+            with closing(conn.cursor()) as cursor:
+                self.create_database(cursor)
+                conn.database = DB_NAME
+                self.create_table(cursor)
+                self.create_indexes(cursor)
+                self.create_summary(cursor)
+                conn.commit()
 
-    def create_database(self):
-        self.cursor.execute("CREATE DATABASE IF NOT EXISTS expenses_db")
-        print("Database 'expenses_db' is ready.")
+    def create_database(self, cursor):
+        cursor.execute(f"CREATE DATABASE IF NOT EXISTS {DB_NAME}")
+        print(f"Database '{DB_NAME}' is ready.")
 
-    def create_table(self):
-        self.cursor.execute("""
+    def create_table(self, cursor):
+        cursor.execute("""
         CREATE TABLE IF NOT EXISTS expenses (
             id INT AUTO_INCREMENT PRIMARY KEY,
             label VARCHAR(255) NOT NULL,
@@ -28,28 +117,361 @@ class Database:
         """)
         print("Table 'expenses' is ready.")
 
+    def create_indexes(self, cursor):
+        indexes = {
+            "ft_expenses_label": "CREATE FULLTEXT INDEX ft_expenses_label ON expenses (label)",
+            "idx_expenses_label": "CREATE INDEX idx_expenses_label ON expenses (label(32))",
+            "idx_expenses_date_id": "CREATE INDEX idx_expenses_date_id ON expenses (date, id)",
+            "idx_expenses_amount": "CREATE INDEX idx_expenses_amount ON expenses (amount)",
+            "idx_expenses_date_amount": "CREATE INDEX idx_expenses_date_amount ON expenses (date, amount)",
+        }
+        cursor.execute(
+            "SELECT DISTINCT index_name FROM information_schema.statistics "
+            "WHERE table_schema = DATABASE() AND table_name = 'expenses'"
+        )
+        existing = {row[0] for row in cursor.fetchall()}
+        for name, statement in indexes.items():
+            if name not in existing:
+                cursor.execute(statement)
+        print("Indexes on 'expenses' are ready.")
+
+    def create_summary(self, cursor):
+        # Running totals per (month, label). The empty string stands for
+        # "all": ('', '') is the overall total, (month, '') a month and
+        # ('', label) a label, so every total is a primary-key lookup. The
+        # triggers keep it in the same transaction as the expense change.
+        cursor.execute("""
+        CREATE TABLE IF NOT EXISTS expense_summary (
+            month CHAR(7) NOT NULL,
+            label VARCHAR(255) NOT NULL,
+            total DECIMAL(14, 2) NOT NULL DEFAULT 0,
+            row_count INT NOT NULL DEFAULT 0,
+            PRIMARY KEY (month, label)
+        )
+        """)
+        cursor.execute("""
+        CREATE TABLE IF NOT EXISTS expense_version (
+            id TINYINT PRIMARY KEY,
+            version BIGINT NOT NULL
+        )
+        """)
+        cursor.execute("INSERT IGNORE INTO expense_version (id, version) VALUES (1, 0)")
+        cursor.execute(
+            "SELECT trigger_name FROM information_schema.triggers "
+            "WHERE trigger_schema = DATABASE() AND event_object_table = 'expenses'"
+        )
+        existing = {row[0] for row in cursor.fetchall()}
+        bump = "UPDATE expense_version SET version = version + 1 WHERE id = 1"
+        triggers = {
+            f"expenses_insert_v{TRIGGERS_VERSION}": (
+                "AFTER INSERT",
+                f"BEGIN {_summary_delta('NEW', '+')}; {bump}; END",
+            ),
+            f"expenses_update_v{TRIGGERS_VERSION}": (
+                "AFTER UPDATE",
+                f"BEGIN {_summary_delta('OLD', '-')}; "
+                f"{_summary_delta('NEW', '+')}; {bump}; END",
+            ),
+            f"expenses_delete_v{TRIGGERS_VERSION}": (
+                "AFTER DELETE",
+                f"BEGIN {_summary_delta('OLD', '-')}; {bump}; END",
+            ),
+        }
+        if existing == set(triggers):
+            print("Table 'expense_summary' is ready.")
+            return
+        # Replace triggers from older versions of this schema.
+        for name in existing:
+            cursor.execute(f"DROP TRIGGER IF EXISTS {name}")
+        for name, (timing, body) in triggers.items():
+            cursor.execute(f"CREATE TRIGGER {name} {timing} ON expenses FOR EACH ROW {body}")
+        self.rebuild_summary(cursor)
+        print("Table 'expense_summary' is ready.")
+
+    def rebuild_summary(self, cursor):
+        cursor.execute("DELETE FROM expense_summary")
+        for month, label in (
+            ("DATE_FORMAT(date, '%Y-%m')", "label"),
+            ("DATE_FORMAT(date, '%Y-%m')", "''"),
+            ("''", "label"),
+            ("''", "''"),
+        ):
+            cursor.execute(
+                "INSERT INTO expense_summary (month, label, total, row_count) "
+                f"SELECT {month}, {label}, SUM(amount), COUNT(*) FROM expenses "
+                f"GROUP BY {month}, {label}"
+            )
+
+    def _acquire(self):
+        # Waits for a worker to give a connection back instead of failing
+        # the operation as soon as all of them are checked out.
+        try:
+            conn = self._idle.get(timeout=ACQUIRE_TIMEOUT)
+        except queue.Empty:
+            raise errors.PoolError("Aucune connexion disponible")
+
+        last_used = self._last_used.get(conn, 0.0)
+        if time.monotonic() - last_used > HEALTH_CHECK_INTERVAL:
+            try:
+                self._reconnect(conn, ping=True)
+            except Exception:
+                self._release(conn)
+                raise
+        return conn
+
+    def _release(self, conn):
+        self._idle.put(conn)
+
+    def _reconnect(self, conn, ping=False):
+        # is_connected() pings the server; a live session keeps its cursors.
+        if not (ping and conn.is_connected()):
+            conn.reconnect(attempts=RECONNECT_ATTEMPTS, delay=1)
+            # Prepared statements die with the server session.
+            with self._lock:
+                self._statements.pop(conn, None)
+        self._last_used[conn] = time.monotonic()
+
+    def _statement(self, conn, query):
+        with self._lock:
+            statements = self._statements.setdefault(conn, {})
+            if query not in statements:
+                statements[query] = conn.cursor(prepared=True)
+            return statements[query]
+
+    def _run(self, work, commit=False):
+        for attempt in range(RECONNECT_ATTEMPTS):
+            conn = self._acquire()
+            try:
+                result = work(conn)
+                if commit:
+                    conn.commit()
+                else:
+                    # Ends the read snapshot: connections are not reset when
+                    # they go back to the pool, and under REPEATABLE READ an
+                    # open transaction would keep serving this old snapshot.
+                    conn.rollback()
+                self._last_used[conn] = time.monotonic()
+                return result
+            except (errors.OperationalError, errors.InterfaceError):
+                if conn.is_connected() or attempt == RECONNECT_ATTEMPTS - 1:
+                    if conn.is_connected():
+                        conn.rollback()
+                    raise
+                # The server went away: reconnect and run the work again.
+                self._reconnect(conn)
+            except Exception:
+                if conn.is_connected():
+                    conn.rollback()
+                raise
+            finally:
+                self._release(conn)
+
+    def _execute(self, query, params=(), fetch=None, commit=False):
+        def work(conn):
+            cursor = self._statement(conn, query)
+            cursor.execute(query, params)
+            if fetch is None:
+                return cursor.lastrowid
+            # Always drain the result so the cached cursor can be reused.
+            rows = cursor.fetchall()
+            if fetch == "one":
+                return rows[0] if rows else None
+            return rows
+
+        return self._run(work, commit=commit)
+
+    def _write(self, query, params, touched=()):
+        # Reads the data version before and after the statement inside its
+        # transaction, so the cache can tell our own change apart from
+        # concurrent writers.
+        def work(conn):
+            before = self._version(conn, LOCK_VERSION)
+            cursor = self._statement(conn, query)
+            cursor.execute(query, params)
+            lastrowid = cursor.lastrowid
+            return lastrowid, before, self._version(conn, SELECT_VERSION)
+
+        lastrowid, before, after = self._run(work, commit=True)
+        self.cache.after_write(before, after, touched)
+        return lastrowid
+
+    def _version(self, conn, query):
+        cursor = self._statement(conn, query)
+        cursor.execute(query)
+        return cursor.fetchall()[0][0]
+
+    def _query(self, query, params=()):
+        # Per-operation cursor for dynamically built statements.
+        def work(conn):
+            with closing(conn.cursor()) as cursor:
+                cursor.execute(query, params)
+                return cursor.fetchall()
+
+        return self._run(work)
+
     def add_expense(self, label, amount, date):
-        query = "INSERT INTO expenses (label, amount, date) VALUES (%s, %s, %s)"
-        self.cursor.execute(query, (label, amount, date))
-        self.conn.commit()
+        return self._write(INSERT_EXPENSE, (label, amount, date))
+
+    def add_expenses(self, expenses):
+        # A plain cursor lets executemany batch the rows into multi-row
+        # INSERTs; the whole list is committed as one transaction.
+        def work(conn):
+            before = self._version(conn, LOCK_VERSION)
+            with closing(conn.cursor()) as cursor:
+                cursor.executemany(INSERT_EXPENSE, expenses)
+                inserted = cursor.rowcount
+            return inserted, before, self._version(conn, SELECT_VERSION)
+
+        inserted, before, after = self._run(work, commit=True)
+        self.cache.after_write(before, after)
+        return inserted
+
+    def apply_mutations(self, mutations):
+        # Group commit for the write-behind queue: an ordered list of
+        # ("add", (label, amount, date)), ("update", (id, label, amount, date))
+        # and ("delete", (id,)) runs in one transaction. Returns the new id
+        # of each add and None for the others.
+        touched = [args[0] for kind, args in mutations if kind != "add"]
+
+        def work(conn):
+            before = self._version(conn, LOCK_VERSION)
+            new_ids = []
+            for kind, args in mutations:
+                if kind == "add":
+                    query, params = INSERT_EXPENSE, args
+                elif kind == "update":
+                    query, params = UPDATE_EXPENSE, args[1:] + args[:1]
+                else:
+                    query, params = DELETE_EXPENSE, args
+                cursor = self._statement(conn, query)
+                cursor.execute(query, params)
+                new_ids.append(cursor.lastrowid if kind == "add" else None)
+            return new_ids, before, self._version(conn, SELECT_VERSION)
+
+        new_ids, before, after = self._run(work, commit=True)
+        self.cache.after_write(before, after, touched)
+        return new_ids
 
     def get_all_expenses(self):
-        self.cursor.execute("SELECT * FROM expenses ORDER BY date DESC")
-        return self.cursor.fetchall()
+        return self._execute(SELECT_ALL_EXPENSES, fetch="all")
+
+    def iter_expenses(self, batch_size=1000):
+        # Unbuffered cursor: MySQL streams the result and only batch_size
+        # rows are held in memory at a time. The connection stays checked
+        # out until the generator is exhausted or closed.
+        conn = self._acquire()
+        cursor = conn.cursor(buffered=False)
+        try:
+            cursor.execute(SELECT_ALL_EXPENSES)
+            while True:
+                rows = cursor.fetchmany(batch_size)
+                if not rows:
+                    break
+                yield rows
+        finally:
+            if conn.unread_result:
+                conn.consume_results()
+            cursor.close()
+            conn.rollback()
+            self._release(conn)
+
+    def get_expenses_page(self, limit=100, after=None):
+        # Keyset pagination: `after` is the (date, id) of the last row of the
+        # previous page, so every page is a bounded range scan on the
+        # (date, id) index no matter how deep the user has scrolled.
+        if after is None:
+            return self._execute(SELECT_FIRST_PAGE, (limit,), fetch="all")
+        after_date, after_id = after
+        return self._execute(
+            SELECT_NEXT_PAGE, (after_date, after_date, after_id, limit), fetch="all"
+        )
+
+    def _search(self, term, limit, offset, after):
+        predicates = self._search_predicates(term)
+        if not predicates:
+            if offset == 0:
+                return self.get_expenses_page(limit, after)
+            predicates = [("TRUE", [])]
+
+        keyset = ""
+        keyset_params = []
+        if after is not None:
+            keyset = " AND (date < %s OR (date = %s AND id < %s))"
+            keyset_params = [after[0], after[0], after[1]]
+
+        # One branch per predicate so each can be answered from its own index
+        # (an OR across a FULLTEXT match and range predicates forces a full
+        # scan), and every branch is capped at the end of the requested page.
+        branches = []
+        params = []
+        for clause, clause_params in predicates:
+            branches.append(
+                f"(SELECT * FROM expenses WHERE ({clause}){keyset} "
+                "ORDER BY date DESC, id DESC LIMIT %s)"
+            )
+            params.extend(clause_params)
+            params.extend(keyset_params)
+            params.append(offset + limit)
+        query = (
+            " UNION ".join(branches)
+            + " ORDER BY date DESC, id DESC LIMIT %s OFFSET %s"
+        )
+        return self._query(query, params + [limit, offset])
+
+    def _search_predicates(self, term):
+        term = term.strip()
+        if not term:
+            return []
+
+        predicates = []
+        words = [word for word in map(fulltext_escape, term.split()) if len(word) >= 3]
+        if words:
+            predicates.append((
+                "MATCH(label) AGAINST (%s IN BOOLEAN MODE)",
+                [" ".join("+" + word + "*" for word in words)],
+            ))
+        predicates.append(("label LIKE %s", [like_escape(term) + "%"]))
+
+        if term.isdigit():
+            predicates.append(("id = %s", [int(term)]))
+
+        amounts = amount_range(term)
+        if amounts:
+            predicates.append(("amount >= %s AND amount < %s", list(amounts)))
+
+        dates = date_range(term)
+        if dates:
+            predicates.append(("date >= %s AND date < %s", list(dates)))
+
+        return predicates
 
     def update_expense(self, expense_id, label, amount, date):
-        query = "UPDATE expenses SET label=%s, amount=%s, date=%s WHERE id=%s"
-        self.cursor.execute(query, (label, amount, date, expense_id))
-        self.conn.commit()
+        # The row is evicted rather than patched: MySQL rounds the amount
+        # and parses the date, so the next read fetches its stored form.
+        self._write(UPDATE_EXPENSE, (label, amount, date, expense_id), touched=[expense_id])
 
     def delete_expense(self, expense_id):
-        self.cursor.execute("DELETE FROM expenses WHERE id=%s", (expense_id,))
-        self.conn.commit()
+        self._write(DELETE_EXPENSE, (expense_id,), touched=[expense_id])
+
+    def close(self):
+        # Also disconnects connections still checked out, e.g. by an export
+        # that is being cancelled.
+        for conn in getattr(self, "_connections", ()):
+            try:
+                conn.disconnect()
+            except errors.Error:
+                pass
 
-    def get_total(self):
-        self.cursor.execute("SELECT SUM(amount) FROM expenses")
-        result = self.cursor.fetchone()[0]
-        return result if result else 0.0
 
-    def __del__(self):
-        self.conn.close()
+def _summary_delta(row, sign):
+    values = ",\n".join(
+        f"({month}, {label}, {sign}{row}.amount, {sign}1)"
+        for month in (f"DATE_FORMAT({row}.date, '%Y-%m')", "''")
+        for label in (f"{row}.label", "''")
+    )
+    return (
+        "INSERT INTO expense_summary (month, label, total, row_count) VALUES\n"
+        + values
+        + "\nON DUPLICATE KEY UPDATE total = total + VALUES(total), "
+        "row_count = row_count + VALUES(row_count)"
+    )
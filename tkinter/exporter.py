@@ -0,0 +1,108 @@
+import csv
+import os
+import threading
+
+DEFAULT_BATCH_SIZE = 5000
+EXPORT_HEADER = ["ID", "Étiquette", "Montant (TND)", "Date"]
+EXPORT_FORMATS = {".csv": "csv", ".parquet": "parquet", ".arrow": "arrow"}
+
+
+class ExportCancelled(Exception):
+    pass
+
+
+def export_format(file_path):
+    extension = os.path.splitext(file_path)[1].lower()
+    return EXPORT_FORMATS.get(extension, "csv")
+
+
+def export_expenses(db, file_path, fmt="csv", batch_size=DEFAULT_BATCH_SIZE,
+                    cancel_event=None, progress=None):
+    # Rows are streamed from the database batch by batch and written
+    # straight out, so memory stays bounded by batch_size. The output is
+    # written to a temporary file and only moved into place once complete.
+    cancel_event = cancel_event or threading.Event()
+    writers = {"csv": _write_csv, "parquet": _write_parquet, "arrow": _write_arrow}
+    if fmt not in writers:
+        raise ValueError(f"Format d'exportation inconnu : {fmt}")
+
+    temp_path = file_path + ".part"
+    try:
+        exported = writers[fmt](db.iter_expenses(batch_size), temp_path, cancel_event, progress)
+        os.replace(temp_path, file_path)
+    except BaseException:
+        if os.path.exists(temp_path):
+            os.remove(temp_path)
+        raise
+    return exported
+
+
+def _batches(batches, cancel_event, progress):
+    exported = 0
+    try:
+        for rows in batches:
+            if cancel_event.is_set():
+                raise ExportCancelled()
+            yield rows
+            exported += len(rows)
+            if progress:
+                progress(exported)
+    finally:
+        batches.close()
+
+
+def _write_csv(batches, path, cancel_event, progress):
+    exported = 0
+    with open(path, mode="w", newline="", encoding="utf-8") as file:
+        writer = csv.writer(file)
+        writer.writerow(EXPORT_HEADER)
+        for rows in _batches(batches, cancel_event, progress):
+            writer.writerows(rows)
+            exported += len(rows)
+    return exported
+
+
+def _arrow_schema():
+    try:
+        import pyarrow as pa
+    except ImportError:
+        raise RuntimeError(
+            "L'exportation Parquet/Arrow nécessite pyarrow (pip install pyarrow)."
+        )
+    return pa, pa.schema([
+        ("id", pa.int32()),
+        ("label", pa.string()),
+        ("amount", pa.decimal128(10, 2)),
+        ("date", pa.date32()),
+    ])
+
+
+def _arrow_batch(pa, schema, rows):
+    columns = list(zip(*rows))
+    return pa.record_batch(
+        [pa.array(column, type=field.type) for column, field in zip(columns, schema)],
+        schema=schema,
+    )
+
+
+def _write_parquet(batches, path, cancel_event, progress):
+    pa, schema = _arrow_schema()
+    import pyarrow.parquet as pq
+
+    exported = 0
+    with pq.ParquetWriter(path, schema) as writer:
+        for rows in _batches(batches, cancel_event, progress):
+            writer.write_batch(_arrow_batch(pa, schema, rows))
+            exported += len(rows)
+    return exported
+
+
+def _write_arrow(batches, path, cancel_event, progress):
+    pa, schema = _arrow_schema()
+
+    exported = 0
+    with pa.OSFile(path, "wb") as sink, pa.ipc.new_file(sink, schema) as writer:
+        for rows in _batches(batches, cancel_event, progress):
+            writer.write_batch(_arrow_batch(pa, schema, rows))
+            exported += len(rows)
+    return exported
@@ -0,0 +1,83 @@
+import csv
+import time
+from validation import validate_batch
+
+DEFAULT_CHUNK_SIZE = 1000
+EXPORT_HEADER = ["ID", "Étiquette", "Montant (TND)", "Date"]
+
+
+class ImportResult:
+    def __init__(self, imported, rejected, elapsed):
+        self.imported = imported
+        self.rejected = rejected
+        self.elapsed = elapsed
+
+    @property
+    def rows_per_second(self):
+        return self.imported / self.elapsed if self.elapsed else 0.0
+
+
+def import_csv(db, file_path, chunk_size=DEFAULT_CHUNK_SIZE, progress=None):
+    # Streams the file so memory stays bounded by chunk_size. Each chunk is
+    # validated, then inserted with one executemany in its own transaction.
+    started = time.perf_counter()
+    imported = 0
+    rejected = []
+    batch = []
+
+    with open(file_path, newline="", encoding="utf-8-sig") as file:
+        for line_number, record in enumerate(csv.reader(file), start=1):
+            if line_number == 1 and _is_header(record):
+                continue
+            if not any(field.strip() for field in record):
+                continue
+            batch.append((line_number, record))
+            if len(batch) >= chunk_size:
+                imported += _import_batch(db, batch, rejected)
+                batch = []
+                _report(progress, imported, rejected, started)
+
+    if batch:
+        imported += _import_batch(db, batch, rejected)
+        _report(progress, imported, rejected, started)
+
+    return ImportResult(imported, rejected, time.perf_counter() - started)
+
+
+def _import_batch(db, batch, rejected):
+    lines, labels, amounts, dates = [], [], [], []
+    for line_number, record in batch:
+        # Files written by export_to_csv carry the id in the first column.
+        if len(record) == 4:
+            record = record[1:]
+        if len(record) != 3:
+            rejected.append((line_number, ["Nombre de colonnes invalide"]))
+            continue
+        label, amount, date_str = (field.strip() for field in record)
+        lines.append(line_number)
+        labels.append(label)
+        amounts.append(amount)
+        dates.append(date_str)
+
+    # Validate the whole chunk column by column instead of row by row.
+    result = validate_batch(labels, amounts, dates)
+    expenses = []
+    for index, line_number in enumerate(lines):
+        if not result.is_valid(index):
+            rejected.append((line_number, result.errors(index)))
+            continue
+        expenses.append((labels[index], float(amounts[index]), dates[index]))
+
+    if expenses:
+        db.add_expenses(expenses)
+    return len(expenses)
+
+
+def _is_header(record):
+    return [field.strip() for field in record[-3:]] == EXPORT_HEADER[-3:]
+
+
+def _report(progress, imported, rejected, started):
+    if progress:
+        elapsed = time.perf_counter() - started
+        progress(imported, len(rejected), imported / elapsed if elapsed else 0.0)
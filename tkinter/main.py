@@ -1,7 +1,14 @@
+import time
+
+# Taken before the heavy imports so the startup report covers them.
+STARTED = time.perf_counter()
+
 import customtkinter as ctk
 from ui import ExpenseApp
+from startup import StartupTimer
 
 if __name__ == "__main__":
     root = ctk.CTk()
-    app = ExpenseApp(root)
+    app = ExpenseApp(root, startup=StartupTimer(STARTED))
+    root.protocol("WM_DELETE_WINDOW", app.close)
     root.mainloop()
\ No newline at end of file
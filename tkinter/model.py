@@ -0,0 +1,127 @@
+from bisect import bisect_left
+from datetime import date, datetime
+from decimal import Decimal, ROUND_HALF_UP
+
+CENTS = Decimal("0.01")
+
+
+class ExpenseModel:
+    # Client-side copy of the rows shown in the table, kept in the same
+    # order as the database query (date DESC, id DESC) so a single mutation
+    # can be patched in with a binary search instead of a refetch.
+
+    def __init__(self):
+        self.rows = []
+        self.keys = []
+        self.by_id = {}
+        self.total = Decimal(0)
+        self.complete = True
+
+    def load(self, rows, total, complete=True):
+        rows = [_normalize(row) for row in rows]
+        rows.sort(key=_sort_key)
+        self.rows[:] = rows
+        self.keys[:] = [_sort_key(row) for row in rows]
+        self.by_id = {row[0]: row for row in rows}
+        self.total = _as_amount(total)
+        self.complete = complete
+
+    def extend(self, rows, complete):
+        # Next keyset page: every row sorts after the ones already loaded.
+        for row in rows:
+            row = _normalize(row)
+            if row[0] not in self.by_id:
+                self.keys.append(_sort_key(row))
+                self.rows.append(row)
+                self.by_id[row[0]] = row
+        self.complete = complete
+
+    def last_key(self):
+        # (date, id) of the last loaded row, used as the keyset cursor.
+        # Rows still waiting in the write-behind queue are not in the
+        # database yet, so they cannot serve as the cursor.
+        for row in reversed(self.rows):
+            if row[0] > 0:
+                return row[3], row[0]
+        return None
+
+    def get(self, expense_id):
+        return self.by_id.get(expense_id)
+
+    def insert(self, row):
+        row = _normalize(row)
+        self.total += row[2]
+        return self._insert(row)
+
+    def update(self, row, old_amount):
+        # old_amount is the amount before the edit, needed for rows that are
+        # not loaded (filtered out by the search or beyond the last page):
+        # those only change the total and show up with the next search.
+        row = _normalize(row)
+        self.total += row[2] - _as_amount(old_amount)
+        old = self.by_id.get(row[0])
+        if old is None:
+            return None
+        self._remove(old)
+        return self._insert(row)
+
+    def remove(self, expense_id, old_amount):
+        self.total -= _as_amount(old_amount)
+        old = self.by_id.get(expense_id)
+        if old is None:
+            return None
+        return self._remove(old)
+
+    def rename(self, temp_id, expense_id):
+        # Swaps a write-behind temporary id for the id the database gave.
+        old = self.by_id.get(temp_id)
+        if old is None:
+            return None
+        self._remove(old)
+        return self._insert((expense_id,) + old[1:])
+
+    def _insert(self, row):
+        key = _sort_key(row)
+        if not self.complete and (not self.keys or key > self.keys[-1]):
+            # Beyond the loaded window; it will arrive with a later page.
+            return None
+        index = bisect_left(self.keys, key)
+        self.keys.insert(index, key)
+        self.rows.insert(index, row)
+        self.by_id[row[0]] = row
+        return index
+
+    def _remove(self, row):
+        index = bisect_left(self.keys, _sort_key(row))
+        del self.keys[index]
+        del self.rows[index]
+        del self.by_id[row[0]]
+        return index
+
+
+def _sort_key(row):
+    # Temporary (negative) ids belong to rows not yet written; they will get
+    # the highest ids, so they sort first within their date, newest first.
+    if row[0] < 0:
+        return (-row[3].toordinal(), 0, row[0])
+    return (-row[3].toordinal(), 1, -row[0])
+
+
+def _normalize(row):
+    expense_id, label, amount, day = row
+    return (expense_id, label, _as_amount(amount), _as_date(day))
+
+
+def _as_amount(value):
+    if value is None:
+        return Decimal(0)
+    # Rounds like the database does when storing the amount.
+    return Decimal(str(value)).quantize(CENTS, rounding=ROUND_HALF_UP)
+
+
+def _as_date(value):
+    if isinstance(value, datetime):
+        return value.date()
+    if isinstance(value, date):
+        return value
+    return datetime.strptime(value, "%Y-%m-%d").date()
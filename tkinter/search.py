@@ -0,0 +1,61 @@
+from tasks import run_in_background
+
+DEFAULT_DELAY_MS = 250
+
+
+class SearchPipeline:
+    def __init__(self, root, query, on_results, on_error=None, delay_ms=DEFAULT_DELAY_MS):
+        self.root = root
+        self.query = query
+        self.on_results = on_results
+        self.on_error = on_error
+        self.delay_ms = delay_ms
+        self.generation = 0
+        self._pending = None
+        self._future = None
+
+    def schedule(self, term):
+        # Every keystroke restarts the debounce window, so only the last
+        # term typed within delay_ms reaches the database.
+        self._cancel_pending()
+        self.generation += 1
+        self._pending = self.root.after(self.delay_ms, self.run, term)
+
+    def run(self, term):
+        self._cancel_pending()
+        if self._future is not None:
+            self._future.cancel()
+        self.generation += 1
+        generation = self.generation
+        self._future = run_in_background(
+            self.root,
+            self.query,
+            term,
+            on_done=lambda results: self._deliver(generation, results),
+            on_error=lambda error: self._fail(generation, error),
+        )
+
+    def cancel(self):
+        self._cancel_pending()
+        if self._future is not None:
+            self._future.cancel()
+        self.generation += 1
+
+    def _cancel_pending(self):
+        if self._pending is not None:
+            self.root.after_cancel(self._pending)
+            self._pending = None
+
+    def _deliver(self, generation, results):
+        # A newer search has started since this one was submitted.
+        if generation != self.generation:
+            return
+        self.on_results(results)
+
+    def _fail(self, generation, error):
+        if generation != self.generation:
+            return
+        if self.on_error:
+            self.on_error(error)
+        else:
+            raise error
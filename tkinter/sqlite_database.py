@@ -0,0 +1,424 @@
+import os
+import sqlite3
+import threading
+from datetime import date, datetime
+from decimal import Decimal, ROUND_HALF_UP
+from storage import ExpenseStore, like_escape, fulltext_escape, amount_range, date_range
+
+DB_PATH = os.environ.get(
+    "EXPENSES_DB_PATH",
+    os.path.join(os.path.dirname(os.path.abspath(__file__)), "expenses.db"),
+)
+SCHEMA_VERSION = 2
+BUSY_TIMEOUT_MS = 5000
+CENT = Decimal("0.01")
+
+# Amounts are stored as integer cents in CENTS columns and dates as ISO
+# text in DATE columns; the converters hand rows back with the same types
+# MySQL returns (Decimal amounts, date objects).
+sqlite3.register_adapter(date, date.isoformat)
+sqlite3.register_converter("CENTS", lambda value: Decimal(int(value)).scaleb(-2))
+sqlite3.register_converter("DATE", lambda value: date.fromisoformat(value.decode()))
+
+INSERT_EXPENSE = "INSERT INTO expenses (label, amount, date) VALUES (?, ?, ?)"
+UPDATE_EXPENSE = "UPDATE expenses SET label=?, amount=?, date=? WHERE id=?"
+DELETE_EXPENSE = "DELETE FROM expenses WHERE id=?"
+SELECT_EXPENSE = "SELECT * FROM expenses WHERE id=?"
+SELECT_VERSION = "SELECT version FROM expense_version WHERE id=1"
+SELECT_ALL_EXPENSES = "SELECT * FROM expenses ORDER BY date DESC, id DESC"
+SELECT_TOTAL = "SELECT total FROM expense_summary WHERE month=? AND label=?"
+SELECT_YEAR_TOTAL = (
+    "SELECT SUM(total) FROM expense_summary "
+    "WHERE month BETWEEN ? AND ? AND label=?"
+)
+SELECT_TOP_LABELS = (
+    "SELECT label, total FROM expense_summary "
+    "WHERE month=? AND label<>'' AND row_count > 0 "
+    "ORDER BY total DESC LIMIT ?"
+)
+SELECT_ROLLUPS = {
+    "day": (
+        "SELECT date, SUM(amount) FROM expenses "
+        "WHERE date >= ? AND date < ? GROUP BY date ORDER BY date"
+    ),
+    "week": (
+        "SELECT date(date, 'weekday 0', '-6 days') AS week, SUM(amount) "
+        "FROM expenses WHERE date >= ? AND date < ? GROUP BY week ORDER BY week"
+    ),
+    "month": (
+        "SELECT month, total FROM expense_summary "
+        "WHERE month >= ? AND month < ? AND label='' AND row_count > 0 "
+        "ORDER BY month"
+    ),
+}
+SELECT_FIRST_PAGE = "SELECT * FROM expenses ORDER BY date DESC, id DESC LIMIT ?"
+# Row values turn the keyset into a single range on the (date, id) index;
+# the OR form the MySQL backend uses makes SQLite scan from the top.
+SELECT_NEXT_PAGE = (
+    "SELECT * FROM expenses WHERE (date, id) < (?, ?) "
+    "ORDER BY date DESC, id DESC LIMIT ?"
+)
+
+
+class SQLiteDatabase(ExpenseStore):
+    # Embedded backend with the same interface as database.Database. Each
+    # thread gets its own connection; in WAL mode readers never wait for
+    # the writer, and writes are serialized by an IMMEDIATE transaction.
+    queries = {
+        "version": SELECT_VERSION,
+        "expense": SELECT_EXPENSE,
+        "total": SELECT_TOTAL,
+        "year_total": SELECT_YEAR_TOTAL,
+        "top_labels": SELECT_TOP_LABELS,
+        **{"rollup_" + bucket: query for bucket, query in SELECT_ROLLUPS.items()},
+    }
+
+    def __init__(self, path=DB_PATH, cache=None):
+        super().__init__(cache)
+        self.path = path
+        self._local = threading.local()
+        self._connections = []
+        self._lock = threading.Lock()
+        self.fulltext = False
+        self.setup_schema()
+
+    def _connection(self):
+        conn = getattr(self._local, "conn", None)
+        if conn is None:
+            # Autocommit mode: transactions are opened explicitly in _write.
+            # sqlite3 keeps its own prepared-statement cache per connection.
+            conn = sqlite3.connect(
+                self.path,
+                isolation_level=None,
+                check_same_thread=False,
+                detect_types=sqlite3.PARSE_DECLTYPES,
+                cached_statements=256,
+            )
+            conn.execute(f"PRAGMA busy_timeout = {BUSY_TIMEOUT_MS}")
+            # In WAL mode NORMAL only syncs at checkpoints: a commit survives
+            # an application crash and costs no fsync.
+            conn.execute("PRAGMA synchronous = NORMAL")
+            self._local.conn = conn
+            with self._lock:
+                self._connections.append(conn)
+        return conn
+
+    def setup_schema(self):
+        conn = self._connection()
+        conn.execute("PRAGMA journal_mode = WAL")
+        version = conn.execute("PRAGMA user_version").fetchone()[0]
+        if version == SCHEMA_VERSION:
+            self.fulltext = conn.execute(
+                "SELECT 1 FROM sqlite_master WHERE name = 'expenses_fts'"
+            ).fetchone() is not None
+            print(f"Database '{self.path}' is ready.")
+            return
+        conn.execute("BEGIN IMMEDIATE")
+        try:
+            self.create_table(conn)
+            self.create_indexes(conn)
+            self.create_summary(conn)
+            self.fulltext = self.create_fulltext(conn)
+            conn.execute(f"PRAGMA user_version = {SCHEMA_VERSION}")
+            conn.execute("COMMIT")
+        except BaseException:
+            conn.execute("ROLLBACK")
+            raise
+        print(f"Database '{self.path}' is ready.")
+
+    def create_table(self, conn):
+        conn.execute("""
+        CREATE TABLE IF NOT EXISTS expenses (
+            id INTEGER PRIMARY KEY AUTOINCREMENT,
+            label TEXT NOT NULL COLLATE NOCASE,
+            amount CENTS NOT NULL,
+            date DATE NOT NULL
+        )
+        """)
+
+    def create_indexes(self, conn):
+        # NOCASE on label lets case-insensitive prefix LIKEs use the index.
+        conn.execute("CREATE INDEX IF NOT EXISTS idx_expenses_label ON expenses (label)")
+        conn.execute("CREATE INDEX IF NOT EXISTS idx_expenses_date_id ON expenses (date, id)")
+        conn.execute("CREATE INDEX IF NOT EXISTS idx_expenses_amount ON expenses (amount)")
+        conn.execute(
+            "CREATE INDEX IF NOT EXISTS idx_expenses_date_amount ON expenses (date, amount)"
+        )
+
+    def create_summary(self, conn):
+        # Same layout as the MySQL backend: running totals per (month,
+        # label), with '' standing for "all", kept up to date by triggers.
+        conn.execute("""
+        CREATE TABLE IF NOT EXISTS expense_summary (
+            month TEXT NOT NULL,
+            label TEXT NOT NULL COLLATE NOCASE,
+            total CENTS NOT NULL DEFAULT 0,
+            row_count INTEGER NOT NULL DEFAULT 0,
+            PRIMARY KEY (month, label)
+        ) WITHOUT ROWID
+        """)
+        conn.execute("""
+        CREATE TABLE IF NOT EXISTS expense_version (
+            id INTEGER PRIMARY KEY,
+            version INTEGER NOT NULL
+        )
+        """)
+        conn.execute("INSERT OR IGNORE INTO expense_version (id, version) VALUES (1, 0)")
+        bump = "UPDATE expense_version SET version = version + 1 WHERE id = 1"
+        triggers = {
+            "expenses_summary_insert": (
+                "AFTER INSERT", f"{_summary_delta('NEW', '+')}; {bump};"
+            ),
+            "expenses_summary_update": (
+                "AFTER UPDATE",
+                f"{_summary_delta('OLD', '-')}; {_summary_delta('NEW', '+')}; {bump};",
+            ),
+            "expenses_summary_delete": (
+                "AFTER DELETE", f"{_summary_delta('OLD', '-')}; {bump};"
+            ),
+        }
+        for name, (timing, body) in triggers.items():
+            conn.execute(f"DROP TRIGGER IF EXISTS {name}")
+            conn.execute(f"CREATE TRIGGER {name} {timing} ON expenses BEGIN {body} END")
+        self.rebuild_summary(conn)
+
+    def rebuild_summary(self, conn):
+        conn.execute("DELETE FROM expense_summary")
+        for month, label in (
+            ("substr(date, 1, 7)", "label"),
+            ("substr(date, 1, 7)", "''"),
+            ("''", "label"),
+            ("''", "''"),
+        ):
+            conn.execute(
+                "INSERT INTO expense_summary (month, label, total, row_count) "
+                f"SELECT {month}, {label}, SUM(amount), COUNT(*) FROM expenses "
+                f"GROUP BY {month}, {label}"
+            )
+
+    def create_fulltext(self, conn):
+        # FTS5 index over the labels, kept in sync by triggers. It plays the
+        # part of the MySQL FULLTEXT index; returns False when this SQLite
+        # build has no FTS5, and search falls back to substring matching.
+        try:
+            conn.execute("""
+            CREATE VIRTUAL TABLE IF NOT EXISTS expenses_fts USING fts5(
+                label, content='expenses', content_rowid='id',
+                tokenize='unicode61 remove_diacritics 2'
+            )
+            """)
+        except sqlite3.OperationalError:
+            return False
+        insert = "INSERT INTO expenses_fts (rowid, label) VALUES (NEW.id, NEW.label)"
+        delete = (
+            "INSERT INTO expenses_fts (expenses_fts, rowid, label) "
+            "VALUES ('delete', OLD.id, OLD.label)"
+        )
+        for name, timing, body in (
+            ("expenses_fts_insert", "AFTER INSERT", f"{insert};"),
+            ("expenses_fts_update", "AFTER UPDATE OF label", f"{delete}; {insert};"),
+            ("expenses_fts_delete", "AFTER DELETE", f"{delete};"),
+        ):
+            conn.execute(f"DROP TRIGGER IF EXISTS {name}")
+            conn.execute(f"CREATE TRIGGER {name} {timing} ON expenses BEGIN {body} END")
+        conn.execute("INSERT INTO expenses_fts (expenses_fts) VALUES ('rebuild')")
+        return True
+
+    def _execute(self, query, params=(), fetch="all"):
+        cursor = self._connection().execute(query, params)
+        if fetch == "one":
+            return cursor.fetchone()
+        return cursor.fetchall()
+
+    def _write(self, work, touched=()):
+        # Same contract as the MySQL backend: the version is read around the
+        # write inside its transaction so the cache can spot other writers.
+        conn = self._connection()
+        conn.execute("BEGIN IMMEDIATE")
+        try:
+            before = conn.execute(SELECT_VERSION).fetchone()[0]
+            result = work(conn)
+            after = conn.execute(SELECT_VERSION).fetchone()[0]
+            conn.execute("COMMIT")
+        except BaseException:
+            conn.execute("ROLLBACK")
+            raise
+        self.cache.after_write(before, after, touched)
+        return result
+
+    def _to_amount(self, value):
+        # SUM() and GROUP BY results lose the declared column type.
+        return Decimal(value).scaleb(-2)
+
+    def _to_date(self, value):
+        return _as_date(value)
+
+    def add_expense(self, label, amount, date):
+        params = (label, _cents(amount), _date(date))
+        return self._write(lambda conn: conn.execute(INSERT_EXPENSE, params).lastrowid)
+
+    def add_expenses(self, expenses):
+        # The whole list goes in as one transaction, so the import pays for
+        # one commit instead of one per row.
+        rows = [(label, _cents(amount), _date(day)) for label, amount, day in expenses]
+        return self._write(lambda conn: conn.executemany(INSERT_EXPENSE, rows).rowcount)
+
+    def apply_mutations(self, mutations):
+        # Group commit for the write-behind queue, see database.Database.
+        touched = [args[0] for kind, args in mutations if kind != "add"]
+
+        def work(conn):
+            new_ids = []
+            for kind, args in mutations:
+                if kind == "add":
+                    label, amount, day = args
+                    cursor = conn.execute(INSERT_EXPENSE, (label, _cents(amount), _date(day)))
+                    new_ids.append(cursor.lastrowid)
+                    continue
+                if kind == "update":
+                    expense_id, label, amount, day = args
+                    conn.execute(UPDATE_EXPENSE, (label, _cents(amount), _date(day), expense_id))
+                else:
+                    conn.execute(DELETE_EXPENSE, args)
+                new_ids.append(None)
+            return new_ids
+
+        return self._write(work, touched)
+
+    def get_all_expenses(self):
+        return self._execute(SELECT_ALL_EXPENSES)
+
+    def iter_expenses(self, batch_size=1000):
+        # Runs on its own connection so the export reads a stable snapshot
+        # while the UI keeps writing.
+        conn = sqlite3.connect(
+            self.path, check_same_thread=False, detect_types=sqlite3.PARSE_DECLTYPES
+        )
+        try:
+            cursor = conn.execute(SELECT_ALL_EXPENSES)
+            while True:
+                rows = cursor.fetchmany(batch_size)
+                if not rows:
+                    break
+                yield rows
+        finally:
+            conn.close()
+
+    def get_expenses_page(self, limit=100, after=None):
+        if after is None:
+            return self._execute(SELECT_FIRST_PAGE, (limit,))
+        after_date, after_id = after
+        return self._execute(SELECT_NEXT_PAGE, (after_date, after_id, limit))
+
+    def _search(self, term, limit, offset, after):
+        predicates = self._search_predicates(term)
+        if not predicates:
+            if offset == 0:
+                return self.get_expenses_page(limit, after)
+            predicates = [("1", [])]
+
+        keyset = ""
+        keyset_params = []
+        if after is not None:
+            keyset = " AND (date, id) < (?, ?)"
+            keyset_params = [after[0], after[1]]
+
+        # One capped branch per predicate, as in the MySQL backend; SQLite
+        # only allows ORDER BY/LIMIT on a compound member inside a subquery.
+        branches = []
+        params = []
+        for clause, clause_params in predicates:
+            branches.append(
+                f"SELECT * FROM (SELECT * FROM expenses WHERE ({clause}){keyset} "
+                "ORDER BY date DESC, id DESC LIMIT ?)"
+            )
+            params.extend(clause_params)
+            params.extend(keyset_params)
+            params.append(offset + limit)
+        query = (
+            " UNION ".join(branches)
+            + " ORDER BY date DESC, id DESC LIMIT ? OFFSET ?"
+        )
+        return self._execute(query, params + [limit, offset])
+
+    def _search_predicates(self, term):
+        term = term.strip()
+        if not term:
+            return []
+
+        predicates = []
+        words = [word for word in map(fulltext_escape, term.split()) if len(word) >= 3]
+        if words and self.fulltext:
+            predicates.append((
+                "id IN (SELECT rowid FROM expenses_fts WHERE expenses_fts MATCH ?)",
+                [" ".join('"' + word + '"*' for word in words)],
+            ))
+        elif words:
+            predicates.append((
+                " AND ".join(["label LIKE ? ESCAPE '\\'"] * len(words)),
+                ["%" + like_escape(word) + "%" for word in words],
+            ))
+        predicates.append(("label LIKE ? ESCAPE '\\'", [like_escape(term) + "%"]))
+
+        if term.isdigit():
+            predicates.append(("id = ?", [int(term)]))
+
+        amounts = amount_range(term)
+        if amounts:
+            predicates.append(("amount >= ? AND amount < ?", [_cents(value) for value in amounts]))
+
+        dates = date_range(term)
+        if dates:
+            predicates.append(("date >= ? AND date < ?", list(dates)))
+
+        return predicates
+
+    def update_expense(self, expense_id, label, amount, date):
+        params = (label, _cents(amount), _date(date), expense_id)
+        self._write(lambda conn: conn.execute(UPDATE_EXPENSE, params), touched=[expense_id])
+
+    def delete_expense(self, expense_id):
+        self._write(lambda conn: conn.execute(DELETE_EXPENSE, (expense_id,)), touched=[expense_id])
+
+    def close(self):
+        with self._lock:
+            connections, self._connections = self._connections, []
+        for conn in connections:
+            conn.close()
+        self._local = threading.local()
+
+
+def _summary_delta(row, sign):
+    values = ",\n".join(
+        f"({month}, {label}, {sign}{row}.amount, {sign}1)"
+        for month in (f"substr({row}.date, 1, 7)", "''")
+        for label in (f"{row}.label", "''")
+    )
+    return (
+        "INSERT INTO expense_summary (month, label, total, row_count) VALUES\n"
+        + values
+        + "\nON CONFLICT (month, label) DO UPDATE SET "
+        "total = total + excluded.total, row_count = row_count + excluded.row_count"
+    )
+
+
+def _as_date(value):
+    if isinstance(value, date):
+        return value
+    return date.fromisoformat(value)
+
+
+def _cents(amount):
+    # Rounds like MySQL does when storing into DECIMAL(10, 2).
+    value = Decimal(str(amount)).quantize(CENT, rounding=ROUND_HALF_UP)
+    return int(value.scaleb(2))
+
+
+def _date(value):
+    # Normalizes the forms strptime accepts ("2024-1-5") to ISO text so the
+    # dates sort correctly.
+    if isinstance(value, datetime):
+        return value.date().isoformat()
+    if isinstance(value, date):
+        return value.isoformat()
+    return datetime.strptime(value, "%Y-%m-%d").date().isoformat()
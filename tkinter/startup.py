@@ -0,0 +1,35 @@
+import csv
+import os
+import time
+from datetime import datetime
+
+# Set EXPENSES_STARTUP_LOG to a CSV path to keep one line per launch.
+STARTUP_LOG = os.environ.get("EXPENSES_STARTUP_LOG")
+
+
+class StartupTimer:
+    # Time-to-interactive milestones, in milliseconds since `started` (taken
+    # by main.py before the heavy imports). Reported once, when the first
+    # page of expenses is on screen.
+
+    def __init__(self, started=None):
+        self.started = time.perf_counter() if started is None else started
+        self.marks = []
+        self.reported = False
+
+    def mark(self, name):
+        self.marks.append((name, (time.perf_counter() - self.started) * 1000))
+
+    def report(self, log_path=STARTUP_LOG):
+        if self.reported:
+            return None
+        self.reported = True
+        text = ", ".join(f"{name} {elapsed:.0f} ms" for name, elapsed in self.marks)
+        print(f"Startup: {text}")
+        if log_path:
+            with open(log_path, "a", newline="", encoding="utf-8") as file:
+                csv.writer(file).writerow(
+                    [datetime.now().isoformat(timespec="seconds")]
+                    + [f"{name}={elapsed:.0f}" for name, elapsed in self.marks]
+                )
+        return text
@@ -0,0 +1,178 @@
+import os
+from cache import ExpenseCache
+from datetime import date, datetime, timedelta
+from decimal import Decimal, InvalidOperation
+
+# Storage backend, chosen with the EXPENSES_BACKEND environment variable.
+BACKENDS = ("mysql", "sqlite")
+DEFAULT_BACKEND = os.environ.get("EXPENSES_BACKEND", "mysql")
+# EXPENSES_WRITE_BEHIND=1 queues mutations and commits them in groups
+# from a background thread (see writeback.py).
+WRITE_BEHIND = os.environ.get("EXPENSES_WRITE_BEHIND", "0") == "1"
+
+
+def open_database(backend=None, **options):
+    # Backends are imported on demand so the SQLite one runs without the
+    # MySQL driver installed.
+    backend = (backend or DEFAULT_BACKEND).lower()
+    if backend == "mysql":
+        from database import Database
+        return Database(**options)
+    if backend == "sqlite":
+        from sqlite_database import SQLiteDatabase
+        return SQLiteDatabase(**options)
+    raise ValueError(f"Stockage inconnu : {backend} (attendu : {', '.join(BACKENDS)})")
+
+
+class ExpenseStore:
+    # Base class of the storage backends. It owns the cache and how reads
+    # are keyed in it; a backend supplies its statements in `queries`,
+    # _execute(query, params, fetch="one"|"all"), _search, the writes
+    # (add_expense, add_expenses, apply_mutations, update_expense,
+    # delete_expense), get_all_expenses, iter_expenses, get_expenses_page
+    # and close.
+    queries = {}
+
+    def __init__(self, cache=None):
+        self.cache = cache or ExpenseCache()
+
+    def _check_cache(self):
+        if self.cache.needs_check():
+            self.cache.validate(self._execute(self.queries["version"], fetch="one")[0])
+        return self.cache.version
+
+    def _to_amount(self, value):
+        # Converts a SUM() computed by the database to a Decimal.
+        return value
+
+    def _to_date(self, value):
+        # Converts a date computed by the database (GROUP BY bucket).
+        return value
+
+    def get_expense(self, expense_id):
+        version = self._check_cache()
+        expense = self.cache.get_row(expense_id)
+        if expense is None:
+            expense = self._execute(self.queries["expense"], (expense_id,), fetch="one")
+            if expense is not None:
+                self.cache.put_row(version, expense)
+        return expense
+
+    def search_expenses(self, term, limit=100, offset=0, after=None):
+        version = self._check_cache()
+        key = (term.strip(), limit, offset, after)
+        expenses = self.cache.get_query(key)
+        if expenses is None:
+            expenses = self._search(term, limit, offset, after)
+            self.cache.put_query(key, version, expenses)
+        return expenses
+
+    def get_total(self, period=None, label=None):
+        # period is None for all time, "YYYY-MM" (or a date) for a month,
+        # or "YYYY" for a year.
+        label = label or ""
+        period = period_key(period)
+        version = self._check_cache()
+        key = ("total", period, label)
+        total = self.cache.get_total(key)
+        if total is not None:
+            return total
+        if len(period) == 4:
+            row = self._execute(
+                self.queries["year_total"], (period + "-01", period + "-12", label),
+                fetch="one",
+            )
+            row = (self._to_amount(row[0]),) if row and row[0] else None
+        else:
+            row = self._execute(self.queries["total"], (period, label), fetch="one")
+        total = row[0] if row and row[0] else 0.0
+        self.cache.put_total(key, version, total)
+        return total
+
+    def get_top_labels(self, period=None, limit=5):
+        period = period_key(period)
+        version = self._check_cache()
+        key = ("top", period, limit)
+        labels = self.cache.get_total(key)
+        if labels is None:
+            labels = self._execute(self.queries["top_labels"], (period, limit), fetch="all")
+            self.cache.put_total(key, version, labels)
+        return labels
+
+    def get_rollup(self, bucket, start, end):
+        # Spend per "day", "week" (starting on Monday) or "month" for dates
+        # in [start, end), as (first day of the bucket, total) pairs. Months
+        # come from the summary table, days and weeks from a GROUP BY.
+        version = self._check_cache()
+        key = ("rollup", bucket, start, end)
+        points = self.cache.get_total(key)
+        if points is not None:
+            return points
+        query = self.queries["rollup_" + bucket]
+        if bucket == "month":
+            params = (start.strftime("%Y-%m"), end.strftime("%Y-%m"))
+            rows = self._execute(query, params, fetch="all")
+            points = [(month_start(month), total) for month, total in rows]
+        else:
+            rows = self._execute(query, (start, end), fetch="all")
+            points = [(self._to_date(day), self._to_amount(total)) for day, total in rows]
+        self.cache.put_total(key, version, points)
+        return points
+
+
+def month_start(month):
+    # "YYYY-MM" summary key to the date of the first day of that month.
+    return date(int(month[:4]), int(month[5:7]), 1)
+
+
+def period_key(period):
+    if period is None:
+        return ""
+    if isinstance(period, (date, datetime)):
+        return period.strftime("%Y-%m")
+    return str(period)
+
+
+def like_escape(value):
+    return value.replace("\\", "\\\\").replace("%", "\\%").replace("_", "\\_")
+
+
+def fulltext_escape(word):
+    # Strip the boolean-mode operators so user input is matched literally.
+    return "".join(ch for ch in word if ch.isalnum() or ch == "_")
+
+
+def amount_range(term):
+    # "12" matches 12.00-12.99 and "12.5" matches 12.50-12.59, which mirrors
+    # the substring match the table used to do on the formatted amount.
+    try:
+        value = Decimal(term)
+    except InvalidOperation:
+        return None
+    if not value.is_finite() or value < 0:
+        return None
+    exponent = value.as_tuple().exponent
+    if exponent < -2:
+        return None
+    step = Decimal(1).scaleb(min(exponent, 0))
+    return value, value + step
+
+
+def date_range(term):
+    for fmt, span in (("%Y-%m-%d", "day"), ("%Y-%m", "month"), ("%Y", "year")):
+        try:
+            start = datetime.strptime(term, fmt).date()
+        except ValueError:
+            continue
+        if span == "day":
+            return start, start + timedelta(days=1)
+        if span == "month":
+            return start, next_month(start)
+        return start, date(start.year + 1, 1, 1)
+    return None
+
+
+def next_month(day):
+    if day.month == 12:
+        return date(day.year + 1, 1, 1)
+    return date(day.year, day.month + 1, 1)
@@ -0,0 +1,147 @@
+import customtkinter as ctk
+
+ROW_HEIGHT = 44
+PREFETCH_ROWS = 50
+
+
+class VirtualTable(ctk.CTkFrame):
+    # Only enough row widgets to fill the viewport are ever created; scrolling
+    # rebinds their text to a different slice of self.rows instead of
+    # creating widgets, so redraw cost does not depend on the row count.
+
+    def __init__(self, master, weights, format_row, on_select=None, on_scroll_end=None,
+                 row_colors=("transparent", "transparent"), text_color=None,
+                 font=("Roboto", 13), row_height=ROW_HEIGHT, **kwargs):
+        super().__init__(master, **kwargs)
+        self.weights = weights
+        self.format_row = format_row
+        self.on_select = on_select
+        self.on_scroll_end = on_scroll_end
+        self.row_colors = row_colors
+        self.text_color = text_color
+        self.font = font
+        self.row_height = row_height
+        self.rows = []
+        self.first = 0
+        self.pool = []
+
+        self.body = ctk.CTkFrame(self, fg_color="transparent")
+        self.body.pack(side="left", fill="both", expand=True)
+        self.scrollbar = ctk.CTkScrollbar(self, command=self.yview)
+        self.scrollbar.pack(side="right", fill="y")
+
+        self.body.bind("<Configure>", self._on_resize)
+        self._bind_wheel(self.body)
+
+    def set_rows(self, rows):
+        self.rows = rows
+        self.first = 0
+        self.refresh()
+
+    def refresh(self):
+        self.first = max(0, min(self.first, len(self.rows) - self.visible_rows()))
+        for slot, row_widgets in enumerate(self.pool):
+            self._bind_slot(slot, row_widgets)
+        self._update_scrollbar()
+        # Ask for more rows before the user actually reaches the end.
+        if self.on_scroll_end and self.first + self.visible_rows() + PREFETCH_ROWS >= len(self.rows):
+            self.on_scroll_end()
+
+    def visible_rows(self):
+        return max(1, self.body.winfo_height() // self.row_height)
+
+    def scroll_to(self, index):
+        self.first = index
+        self.refresh()
+
+    def yview(self, *args):
+        if not args:
+            return
+        if args[0] == "moveto":
+            self.first = int(float(args[1]) * len(self.rows))
+        elif args[0] == "scroll":
+            step = int(args[1])
+            if args[2] == "pages":
+                step *= self.visible_rows()
+            self.first += step
+        self.refresh()
+
+    def _on_resize(self, event):
+        needed = event.height // self.row_height + 1
+        while len(self.pool) < needed:
+            self.pool.append(self._create_slot(len(self.pool)))
+        while len(self.pool) > needed:
+            self.pool.pop()["frame"].destroy()
+        self.refresh()
+
+    def _create_slot(self, slot):
+        frame = ctk.CTkFrame(
+            self.body, height=self.row_height, corner_radius=6,
+            fg_color=self.row_colors[slot % 2],
+        )
+        labels = []
+        for col_idx, weight in enumerate(self.weights):
+            frame.grid_columnconfigure(col_idx, weight=weight, uniform="col")
+            label = ctk.CTkLabel(
+                frame,
+                text="",
+                font=self.font,
+                text_color=self.text_color,
+                anchor="w",
+                padx=15,
+            )
+            label.grid(row=0, column=col_idx, sticky="ew", pady=8)
+            labels.append(label)
+        frame.grid_propagate(False)
+
+        for widget in [frame] + labels:
+            widget.bind("<Button-1>", lambda e, s=slot: self._on_click(s))
+            self._bind_wheel(widget)
+        return {"frame": frame, "labels": labels, "texts": [""] * len(labels),
+                "color": self.row_colors[slot % 2], "shown": False}
+
+    def _bind_slot(self, slot, row_widgets):
+        index = self.first + slot
+        frame = row_widgets["frame"]
+        if index >= len(self.rows):
+            if row_widgets["shown"]:
+                frame.place_forget()
+                row_widgets["shown"] = False
+            return
+
+        # Reconfiguring a CTk widget redraws it, so only touch what changed.
+        values = self.format_row(self.rows[index])
+        for col_idx, value in enumerate(values):
+            if row_widgets["texts"][col_idx] != value:
+                row_widgets["labels"][col_idx].configure(text=value)
+                row_widgets["texts"][col_idx] = value
+        color = self.row_colors[index % 2]
+        if row_widgets["color"] != color:
+            frame.configure(fg_color=color)
+            row_widgets["color"] = color
+        if not row_widgets["shown"]:
+            frame.place(x=0, y=slot * self.row_height, relwidth=1)
+            row_widgets["shown"] = True
+
+    def _update_scrollbar(self):
+        total = len(self.rows)
+        if not total:
+            self.scrollbar.set(0, 1)
+            return
+        end = min(total, self.first + self.visible_rows())
+        self.scrollbar.set(self.first / total, end / total)
+
+    def _on_click(self, slot):
+        index = self.first + slot
+        if self.on_select and index < len(self.rows):
+            self.on_select(self.rows[index])
+
+    def _bind_wheel(self, widget):
+        widget.bind("<MouseWheel>", self._on_wheel)
+        widget.bind("<Button-4>", lambda e: self.yview("scroll", -3, "units"))
+        widget.bind("<Button-5>", lambda e: self.yview("scroll", 3, "units"))
+
+    def _on_wheel(self, event):
+        # Windows reports multiples of 120 per notch, macOS small deltas.
+        step = -event.delta // 120 if abs(event.delta) >= 120 else -event.delta
+        self.yview("scroll", step * 3, "units")
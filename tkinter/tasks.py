@@ -0,0 +1,45 @@
+import queue
+from concurrent.futures import ThreadPoolExecutor
+
+POLL_INTERVAL_MS = 20
+
+_executor = ThreadPoolExecutor(max_workers=4, thread_name_prefix="expense-worker")
+
+
+def run_in_background(root, func, *args, on_done=None, on_error=None, on_progress=None):
+    # Tk is not thread-safe: the worker only computes, and the result is
+    # handed back on the Tk thread by polling the future with after().
+    # With on_progress, func also receives a progress callable whose latest
+    # report is delivered on the Tk thread at the next poll.
+    updates = queue.SimpleQueue()
+    kwargs = {}
+    if on_progress:
+        kwargs["progress"] = lambda *report: updates.put(report)
+    future = _executor.submit(func, *args, **kwargs)
+
+    def poll():
+        latest = None
+        while not updates.empty():
+            latest = updates.get()
+        if latest is not None:
+            on_progress(*latest)
+        if not future.done():
+            root.after(POLL_INTERVAL_MS, poll)
+            return
+        if future.cancelled():
+            return
+        error = future.exception()
+        if error is not None:
+            if on_error:
+                on_error(error)
+            else:
+                raise error
+        elif on_done:
+            on_done(future.result())
+
+    root.after(POLL_INTERVAL_MS, poll)
+    return future
+
+
+def shutdown():
+    _executor.shutdown(wait=False, cancel_futures=True)
@@ -0,0 +1,48 @@
+import random
+import validation
+from validation import validate_batch, validate_fields
+
+ROWS = 3000
+LABELS = ["Courses", "  loyer ", "", "   ", "\t", "\x00", "café\x00", "é"]
+AMOUNTS = [
+    "12.5", "0", "-3", "1e3", " 7 ", "1_000", "abc", "", "nan", "inf", "-inf",
+    "0x10", "5\x00", "5\x005", "\x00", "١٢", "+.5", "1,5",
+]
+DATES = [
+    "2024-01-05", "2024-02-29", "2023-02-29", "2024-13-01", "2024-00-10",
+    "2024-1-5", "0000-01-01", "2024/01/05", "2024-01-05\x00", "", "abcd-ef-gh",
+    "２０２４-01-05", " 2024-01-05",
+]
+
+
+def _rows(rng, amounts):
+    return [
+        (rng.choice(LABELS), rng.choice(amounts), rng.choice(DATES))
+        for _ in range(ROWS)
+    ]
+
+
+def _check(rows):
+    labels, amounts, dates = (list(column) for column in zip(*rows))
+    result = validate_batch(labels, amounts, dates)
+    for index, row in enumerate(rows):
+        assert result.errors(index) == validate_fields(*row), row
+
+
+def test_batch_matches_fields():
+    # Both the NumPy path and the row by row fallback must give the same
+    # messages as validate_fields, including for values NumPy would alter.
+    rng = random.Random(0)
+    numbers = [12.5, 0, -3, 7, 0.0, float("nan"), float("inf")]
+    try:
+        for np in (validation._numpy(), False):
+            validation.np = np
+            _check(_rows(rng, AMOUNTS))
+            _check(_rows(rng, numbers))
+    finally:
+        validation.np = None
+
+
+if __name__ == "__main__":
+    test_batch_matches_fields()
+    print("ok")
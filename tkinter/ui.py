@@ -1,14 +1,28 @@
 import customtkinter as ctk
 from tkinter import messagebox, filedialog
-from datetime import datetime
-import csv
+from datetime import date, datetime, timedelta
+import threading
 from validation import validate_fields
-from database import Database
+from storage import open_database, DEFAULT_BACKEND, WRITE_BEHIND
+from search import SearchPipeline, DEFAULT_DELAY_MS
+from table import VirtualTable
+from model import ExpenseModel
+from exporter import export_expenses, export_format, ExportCancelled
+from tasks import run_in_background, shutdown, POLL_INTERVAL_MS
+from writeback import WriteBehindQueue
+from charts import ChartCache
+from startup import StartupTimer
+
+PAGE_SIZE = 200
+SKELETON_ROWS = 12
+RECONNECT_DELAY_MS = 5000
 
 
 class ExpenseApp:
-    def __init__(self, root):
+    def __init__(self, root, search_delay_ms=DEFAULT_DELAY_MS, write_behind=WRITE_BEHIND,
+                 startup=None):
         self.root = root
+        self.startup = startup or StartupTimer()
         self.root.title("Smart Expense Manager")
         self.root.geometry("1200x800")
         self.root.resizable(True, True)
@@ -35,14 +49,70 @@ class ExpenseApp:
         self.search_var = ctk.StringVar()
         self.search_var.trace('w', self.on_search)
 
-        # Database
-        self.db = Database()
+        # Database: connected in the background once the window is up.
+        self.db = None
+        self.write_behind = write_behind
+        self.writes = None
+        self.polling_writes = False
+        self.charts = ChartCache()
+        self.analytics = None
         self.selected_id = None
+        self.model = ExpenseModel()
+        self.export_cancel = None
+        self.loading_page = False
+        self.search = SearchPipeline(
+            self.root,
+            self.query_expenses,
+            self.display_expenses,
+            on_error=self.on_search_error,
+            delay_ms=search_delay_ms,
+        )
 
         # Setup UI
         self.setup_ui()
+        self.table.set_rows([None] * SKELETON_ROWS)
+        self.startup.mark("interface")
+        self.root.after_idle(self.on_window_shown)
+
+    def on_window_shown(self):
+        self.startup.mark("fenêtre")
+        self.connect()
+
+    def connect(self):
+        # Connecting and checking the schema can take seconds (or fail when
+        # the server is down), so it runs off the Tk thread.
+        self.set_connection_status("Connexion...", self.warning_color)
+        run_in_background(
+            self.root,
+            open_database,
+            on_done=self.on_connected,
+            on_error=self.on_connect_error,
+        )
+
+    def on_connected(self, db):
+        self.db = db
+        # With write-behind, mutations are applied to the model at once and
+        # committed in groups by a background thread.
+        if self.write_behind:
+            self.writes = WriteBehindQueue(self.db)
+        self.startup.mark("base")
+        self.set_connection_status(f"Connecté ({DEFAULT_BACKEND})", self.success_color)
         self.fetch_expenses()
 
+    def on_connect_error(self, error):
+        self.set_connection_status("Hors ligne, nouvel essai...", self.danger_color)
+        self.status_label.configure(text=f"Connexion impossible : {error}")
+        self.root.after(RECONNECT_DELAY_MS, self.connect)
+
+    def set_connection_status(self, text, color):
+        self.connection_label.configure(text=f"● {text}", text_color=color)
+
+    def require_db(self):
+        if self.db is None:
+            messagebox.showinfo("Connexion", "La base de données n'est pas encore connectée.")
+            return False
+        return True
+
     def setup_ui(self):
         self.root.configure(fg_color=self.primary_color)
         
@@ -125,7 +195,8 @@ class ExpenseApp:
             ("Ajouter", self.success_color, self.add_expense),
             ("Modifier", self.warning_color, self.update_expense),
             ("Supprimer", self.danger_color, self.delete_expense),
-            ("Effacer", self.secondary_color, self.clear_fields)
+            ("Effacer", self.secondary_color, self.clear_fields),
+            ("Analyses", self.accent_color, self.open_analytics)
         ]
 
         for text, color, command in buttons:
@@ -168,10 +239,24 @@ class ExpenseApp:
             corner_radius=8
         ).pack(side="left", fill="x", expand=True, padx=(0, 10))
 
+        # Import button
+        self.import_button = ctk.CTkButton(
+            header,
+            text="Importer CSV",
+            font=("Roboto", 13, "bold"),
+            fg_color=self.accent_color,
+            hover_color=self.success_color,
+            width=130,
+            height=45,
+            corner_radius=8,
+            command=self.import_from_csv
+        )
+        self.import_button.pack(side="right", padx=(10, 0))
+
         # Export button
-        ctk.CTkButton(
+        self.export_button = ctk.CTkButton(
             header,
-            text="Exporter CSV",
+            text="Exporter",
             font=("Roboto", 13, "bold"),
             fg_color=self.accent_color,
             hover_color=self.success_color,
@@ -179,7 +264,8 @@ class ExpenseApp:
             height=45,
             corner_radius=8,
             command=self.export_to_csv
-        ).pack(side="right")
+        )
+        self.export_button.pack(side="right")
 
         # Table
         self.setup_table(content)
@@ -197,6 +283,30 @@ class ExpenseApp:
         )
         self.total_label.pack(side="right", padx=20, pady=10)
 
+        self.summary_label = ctk.CTkLabel(
+            footer,
+            text="",
+            font=("Roboto", 13),
+            text_color=self.text_color
+        )
+        self.summary_label.pack(side="right", padx=20, pady=10)
+
+        self.status_label = ctk.CTkLabel(
+            footer,
+            text="",
+            font=("Roboto", 13),
+            text_color=self.muted_text
+        )
+        self.status_label.pack(side="left", padx=20, pady=10)
+
+        self.connection_label = ctk.CTkLabel(
+            footer,
+            text="",
+            font=("Roboto", 13),
+            text_color=self.muted_text
+        )
+        self.connection_label.pack(side="left", padx=(20, 0), pady=10, before=self.status_label)
+
     def setup_table(self, parent):
         # Table container
         table_container = ctk.CTkFrame(parent, fg_color=self.primary_color, corner_radius=10)
@@ -209,7 +319,7 @@ class ExpenseApp:
         
         for idx, header in enumerate(headers):
             weight = 3 if idx == 1 else 1
-            header_frame.grid_columnconfigure(idx, weight=weight)
+            header_frame.grid_columnconfigure(idx, weight=weight, uniform="col")
             ctk.CTkLabel(
                 header_frame,
                 text=header,
@@ -217,80 +327,175 @@ class ExpenseApp:
                 text_color=self.muted_text
             ).grid(row=0, column=idx, sticky="w")
 
-        # Scrollable frame for expenses
-        self.scrollable_table = ctk.CTkScrollableFrame(
+        # Virtualized rows for expenses
+        self.table = VirtualTable(
             table_container,
-            fg_color="transparent"
+            weights=[1, 3, 1, 1],
+            format_row=self.format_row,
+            on_select=lambda expense: expense and self.on_row_select(expense[0]),
+            on_scroll_end=self.load_more,
+            row_colors=(self.secondary_color, self.primary_color),
+            text_color=self.text_color,
+            fg_color="transparent",
         )
-        self.scrollable_table.pack(fill="both", expand=True, padx=5, pady=(0, 10))
-
-        for i in range(4):
-            weight = 3 if i == 1 else 1
-            self.scrollable_table.grid_columnconfigure(i, weight=weight)
+        self.table.pack(fill="both", expand=True, padx=5, pady=(0, 10))
 
     def on_search(self, *args):
-        self.fetch_expenses()
+        # Before the connection the term is simply used by the first fetch.
+        if self.db is not None:
+            self.search.schedule(self.search_var.get())
 
     def fetch_expenses(self):
-        # Clear existing table
-        for widget in self.scrollable_table.winfo_children():
-            widget.destroy()
-
-        # Fetch and filter expenses
-        expenses = self.db.get_all_expenses()
-        search_term = self.search_var.get().lower()
-        filtered_expenses = [
-            exp for exp in expenses
-            if search_term in str(exp[0]).lower() or
-            search_term in exp[1].lower() or
-            search_term in str(exp[2]).lower() or
-            search_term in str(exp[3]).lower()
-        ]
+        if self.db is not None:
+            self.search.run(self.search_var.get())
+
+    def query_expenses(self, term):
+        # Runs on a worker thread: no Tk calls here. Queued writes go first
+        # so the results include them.
+        self.flush_writes()
+        return self.db.search_expenses(term, PAGE_SIZE, 0), self.db.get_total()
+
+    def on_search_error(self, error):
+        messagebox.showerror("Erreur", f"La recherche a échoué : {error}")
+
+    def display_expenses(self, results):
+        expenses, total = results
+        self.loading_page = False
+        self.model.load(expenses, total, complete=len(expenses) < PAGE_SIZE)
+        self.table.set_rows(self.model.rows)
+        self.update_total()
+        self.refresh_summary()
+        if not self.startup.reported:
+            self.startup.mark("première page")
+            self.status_label.configure(text=f"Prêt en {self.startup.marks[-1][1]:.0f} ms")
+            self.startup.report()
+
+    def refresh_summary(self):
+        if self.analytics is not None and self.analytics.winfo_exists():
+            self.analytics.refresh()
+        run_in_background(
+            self.root,
+            self.query_summary,
+            on_done=self.display_summary,
+            on_error=lambda error: self.summary_label.configure(text=""),
+        )
 
-        # Populate table
-        for row_idx, expense in enumerate(filtered_expenses):
-            expense_id, label, amount, date = expense
-            row_data = [str(expense_id), label, f"{amount:.2f}", date]
-            
-            row_frame = ctk.CTkFrame(
-                self.scrollable_table,
-                fg_color=self.secondary_color if row_idx % 2 == 0 else "transparent",
-                corner_radius=6
-            )
-            row_frame.grid(row=row_idx, column=0, columnspan=4, sticky="ew", pady=2)
-            row_frame.bind("<Button-1>", lambda e, id=expense_id: self.on_row_select(id))
-
-            for col_idx, value in enumerate(row_data):
-                weight = 3 if col_idx == 1 else 1
-                row_frame.grid_columnconfigure(col_idx, weight=weight)
-                ctk.CTkLabel(
-                    row_frame,
-                    text=value,
-                    font=("Roboto", 13),
-                    text_color=self.text_color,
-                    anchor="w",
-                    padx=15,
-                    pady=12
-                ).grid(row=0, column=col_idx, sticky="w")
-
-        # Update total
-        total = self.db.get_total()
-        self.total_label.configure(text=f"Total: {total:.2f} TND")
+    def query_summary(self):
+        # Runs on a worker thread; every lookup hits expense_summary.
+        self.flush_writes()
+        this_month = date.today().replace(day=1)
+        last_month = (this_month - timedelta(days=1)).replace(day=1)
+        return (
+            self.db.get_total(period=this_month),
+            self.db.get_total(period=last_month),
+            self.db.get_top_labels(period=this_month, limit=1),
+        )
+
+    def display_summary(self, summary):
+        this_month, last_month, top_labels = summary
+        text = (
+            f"Ce mois : {this_month:.2f} TND   "
+            f"Mois dernier : {last_month:.2f} TND"
+        )
+        if top_labels:
+            label, amount = top_labels[0]
+            text += f"   Top : {label} ({amount:.2f} TND)"
+        self.summary_label.configure(text=text)
+
+    def open_analytics(self):
+        if not self.require_db():
+            return
+        if self.analytics is not None and self.analytics.winfo_exists():
+            self.analytics.focus()
+            return
+        # Imported on first use: not needed to show the main window.
+        from analytics import AnalyticsWindow
+        self.analytics = AnalyticsWindow(
+            self.root,
+            self.db,
+            self.charts,
+            before_query=self.flush_writes,
+            colors={
+                "primary": self.primary_color,
+                "muted": self.muted_text,
+                "text": self.text_color,
+            },
+        )
+
+    def load_more(self):
+        if self.model.complete or self.loading_page:
+            return
+        self.loading_page = True
+        generation = self.search.generation
+        run_in_background(
+            self.root,
+            self.search_page,
+            self.search_var.get(),
+            PAGE_SIZE,
+            0,
+            self.model.last_key(),
+            on_done=lambda rows: self.append_expenses(generation, rows),
+            on_error=lambda error: self.on_page_error(generation, error),
+        )
+
+    def search_page(self, term, limit, offset, after):
+        self.flush_writes()
+        return self.db.search_expenses(term, limit, offset, after)
+
+    def on_page_error(self, generation, error):
+        if generation != self.search.generation:
+            return
+        # Clear the flag so scrolling can retry the page.
+        self.loading_page = False
+        self.on_search_error(error)
+
+    def append_expenses(self, generation, rows):
+        # Drop pages that belong to a search the user has since replaced.
+        if generation != self.search.generation:
+            return
+        self.loading_page = False
+        self.model.extend(rows, complete=len(rows) < PAGE_SIZE)
+        self.table.refresh()
+
+    def refresh_table(self):
+        self.table.refresh()
+        self.update_total()
+        self.refresh_summary()
+
+    def update_total(self):
+        self.total_label.configure(text=f"Total: {self.model.total:.2f} TND")
+
+    def format_row(self, expense):
+        if expense is None:
+            # Skeleton row shown until the first page arrives.
+            return ["", "░" * 12, "░" * 5, "░" * 8]
+        expense_id, label, amount, expense_date = expense
+        return [str(expense_id), label, f"{amount:.2f}", str(expense_date)]
 
     def add_expense(self):
+        if not self.require_db():
+            return
         errors = validate_fields(
             self.label_var.get(), self.amount_var.get(), self.date_var.get()
         )
         if errors:
             messagebox.showerror("Erreur", "\n".join(errors))
             return
-        self.db.add_expense(
+        expense = (
             self.label_var.get(), float(self.amount_var.get()), self.date_var.get()
         )
+        if self.writes:
+            expense_id = self.writes.add(*expense)
+            self.poll_writes()
+        else:
+            expense_id = self.db.add_expense(*expense)
+        self.model.insert((expense_id,) + expense)
         self.clear_fields()
-        self.fetch_expenses()
+        self.refresh_table()
 
     def update_expense(self):
+        if not self.require_db():
+            return
         if not self.selected_id:
             messagebox.showinfo("Sélection", "Veuillez sélectionner une dépense.")
             return
@@ -300,32 +505,108 @@ class ExpenseApp:
         if errors:
             messagebox.showerror("Erreur", "\n".join(errors))
             return
-        self.db.update_expense(
+        expense = (
             self.selected_id,
             self.label_var.get(),
             float(self.amount_var.get()),
             self.date_var.get(),
         )
+        old_amount = self.old_amount(self.selected_id)
+        if self.writes:
+            self.writes.update(*expense)
+            self.poll_writes()
+        else:
+            self.db.update_expense(*expense)
+        if old_amount is None:
+            self.fetch_expenses()
+        else:
+            self.model.update(expense, old_amount)
         self.clear_fields()
-        self.fetch_expenses()
+        self.refresh_table()
 
     def delete_expense(self):
+        if not self.require_db():
+            return
         if not self.selected_id:
             messagebox.showinfo("Sélection", "Veuillez sélectionner une dépense.")
             return
         if messagebox.askyesno("Confirmation", "Supprimer cette dépense ?"):
-            self.db.delete_expense(self.selected_id)
+            old_amount = self.old_amount(self.selected_id)
+            if self.writes:
+                self.writes.delete(self.selected_id)
+                self.poll_writes()
+            else:
+                self.db.delete_expense(self.selected_id)
+            if old_amount is None:
+                self.fetch_expenses()
+            else:
+                self.model.remove(self.selected_id, old_amount)
             self.clear_fields()
-            self.fetch_expenses()
+            self.refresh_table()
+
+    def old_amount(self, expense_id):
+        # The running total is patched with the difference. The selected row
+        # may not be loaded (a search filtered it out since): its amount then
+        # comes from the database, once any queued write to it is applied.
+        # None if it is gone, in which case the caller reloads everything.
+        row = self.model.get(expense_id)
+        if row is None:
+            self.flush_writes()
+            if self.writes:
+                expense_id = self.writes.resolve(expense_id)
+            row = self.db.get_expense(expense_id)
+        return None if row is None else row[2]
+
+    def flush_writes(self):
+        if self.writes:
+            self.writes.flush()
+
+    def poll_writes(self):
+        # Hands the write-behind results to the Tk thread; polls only while
+        # something is queued. pending is read first: a batch queues its
+        # event before it stops counting as pending, so a batch that ends
+        # while the events are handled is picked up by the next poll.
+        pending = self.writes.pending
+        for event, value in self.writes.poll():
+            if event == "flushed":
+                self.on_writes_flushed(value)
+            else:
+                self.on_writes_error(value)
+        if pending:
+            if not self.polling_writes:
+                self.polling_writes = True
+                self.root.after(POLL_INTERVAL_MS, self.poll_writes_later)
+        else:
+            self.polling_writes = False
+
+    def poll_writes_later(self):
+        self.polling_writes = False
+        self.poll_writes()
+
+    def on_writes_flushed(self, new_ids):
+        for temp_id, expense_id in new_ids.items():
+            self.model.rename(temp_id, expense_id)
+            if self.selected_id == temp_id:
+                self.selected_id = expense_id
+        self.table.refresh()
+        self.refresh_summary()
+
+    def on_writes_error(self, error):
+        # The optimistic changes of the failed batch were rolled back in the
+        # database: reload so the table shows what was actually saved.
+        messagebox.showerror("Erreur", f"L'enregistrement a échoué : {error}")
+        self.fetch_expenses()
 
     def on_row_select(self, expense_id):
+        # The clicked row is already in the model; the database cache
+        # covers anything else without a round-trip.
+        expense = self.model.get(expense_id) or self.db.get_expense(expense_id)
+        if expense is None:
+            return
         self.selected_id = expense_id
-        for expense in self.db.get_all_expenses():
-            if expense[0] == expense_id:
-                self.label_var.set(expense[1])
-                self.amount_var.set(str(expense[2]))
-                self.date_var.set(expense[3])
-                break
+        self.label_var.set(expense[1])
+        self.amount_var.set(str(expense[2]))
+        self.date_var.set(str(expense[3]))
 
     def clear_fields(self):
         self.label_var.set("")
@@ -333,22 +614,118 @@ class ExpenseApp:
         self.date_var.set(datetime.today().strftime("%Y-%m-%d"))
         self.selected_id = None
 
+    def import_from_csv(self):
+        if not self.require_db():
+            return
+        from importer import import_csv
+        file_path = filedialog.askopenfilename(
+            filetypes=[("Fichiers CSV", "*.csv")]
+        )
+        if not file_path:
+            return
+        self.import_button.configure(state="disabled")
+        self.status_label.configure(text="Importation en cours...")
+        run_in_background(
+            self.root,
+            import_csv,
+            self.db,
+            file_path,
+            on_done=self.on_import_done,
+            on_error=self.on_import_error,
+            on_progress=self.on_import_progress,
+        )
+
+    def on_import_progress(self, imported, rejected, rate):
+        self.status_label.configure(
+            text=f"Importation : {imported} lignes ({rate:.0f} lignes/s)"
+        )
+
+    def on_import_done(self, result):
+        self.import_button.configure(state="normal")
+        self.status_label.configure(
+            text=f"{result.imported} lignes importées ({result.rows_per_second:.0f} lignes/s)"
+        )
+        message = (
+            f"{result.imported} dépenses importées en {result.elapsed:.1f} s "
+            f"({result.rows_per_second:.0f} lignes/s)."
+        )
+        if result.rejected:
+            details = "\n".join(
+                f"Ligne {line}: {', '.join(errors)}"
+                for line, errors in result.rejected[:10]
+            )
+            message += f"\n\n{len(result.rejected)} lignes rejetées :\n{details}"
+        messagebox.showinfo("Importation", message)
+        self.fetch_expenses()
+
+    def on_import_error(self, error):
+        self.import_button.configure(state="normal")
+        self.status_label.configure(text="")
+        messagebox.showerror("Erreur", f"L'importation a échoué : {error}")
+        self.fetch_expenses()
+
     def export_to_csv(self):
+        if not self.require_db():
+            return
+        if self.export_cancel is not None:
+            self.export_cancel.set()
+            return
         file_path = filedialog.asksaveasfilename(
             defaultextension=".csv",
-            filetypes=[("Fichiers CSV", "*.csv")]
+            filetypes=[
+                ("Fichiers CSV", "*.csv"),
+                ("Fichiers Parquet", "*.parquet"),
+                ("Fichiers Arrow", "*.arrow"),
+            ]
         )
         if not file_path:
             return
-        with open(file_path, mode="w", newline="", encoding="utf-8") as file:
-            writer = csv.writer(file)
-            writer.writerow(["ID", "Étiquette", "Montant (TND)", "Date"])
-            for expense in self.db.get_all_expenses():
-                writer.writerow(expense)
+        self.export_cancel = threading.Event()
+        self.export_button.configure(text="Annuler")
+        self.status_label.configure(text="Exportation en cours...")
+        run_in_background(
+            self.root,
+            export_expenses,
+            self.db,
+            file_path,
+            export_format(file_path),
+            cancel_event=self.export_cancel,
+            on_done=self.on_export_done,
+            on_error=self.on_export_error,
+            on_progress=self.on_export_progress,
+        )
+
+    def on_export_progress(self, exported):
+        self.status_label.configure(text=f"Exportation : {exported} lignes")
+
+    def on_export_done(self, exported):
+        self.export_cancel = None
+        self.export_button.configure(text="Exporter")
+        self.status_label.configure(text=f"{exported} lignes exportées")
         messagebox.showinfo("Succès", "Exportation réussie.")
 
+    def on_export_error(self, error):
+        self.export_cancel = None
+        self.export_button.configure(text="Exporter")
+        if isinstance(error, ExportCancelled):
+            self.status_label.configure(text="Exportation annulée")
+            return
+        self.status_label.configure(text="")
+        messagebox.showerror("Erreur", f"L'exportation a échoué : {error}")
+
+    def close(self):
+        # Bound to the window's close button: queued writes are committed
+        # before the connections go away.
+        self.search.cancel()
+        if self.writes:
+            self.writes.close()
+        shutdown()
+        if self.db is not None:
+            self.db.close()
+        self.root.destroy()
 
 if __name__ == "__main__":
     root = ctk.CTk()
-    app = ExpenseApp(root)
+    app = ExpenseApp(root, startup=StartupTimer())
+    root.protocol("WM_DELETE_WINDOW", app.close)
     root.mainloop()
\ No newline at end of file
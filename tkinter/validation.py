@@ -18,4 +18,189 @@ def validate_fields(label, amount, date_str):
     except ValueError:
         errors.append("Format de date invalide (attendu YYYY-MM-DD)")
         
-    return errors
\ No newline at end of file
+    return errors
+
+# NumPy is imported on the first batch so starting the app does not pay
+# for it; False once it turned out to be missing.
+np = None
+
+# Bits of the per-row error mask returned by validate_batch.
+LABEL_EMPTY = 1
+AMOUNT_INVALID = 2
+AMOUNT_NOT_POSITIVE = 4
+DATE_INVALID = 8
+
+ERROR_MESSAGES = [
+    (LABEL_EMPTY, "Étiquette ne peut pas être vide"),
+    (AMOUNT_INVALID, "Le montant doit être un nombre valide"),
+    (AMOUNT_NOT_POSITIVE, "Le montant doit être positif"),
+    (DATE_INVALID, "Format de date invalide (attendu YYYY-MM-DD)"),
+]
+
+
+class BatchValidation:
+    def __init__(self, mask):
+        self.mask = mask
+
+    def __len__(self):
+        return len(self.mask)
+
+    def is_valid(self, index):
+        return not self.mask[index]
+
+    def invalid_rows(self):
+        return [index for index, bits in enumerate(self.mask) if bits]
+
+    def errors(self, index):
+        # Same messages, in the same order, as validate_fields.
+        bits = int(self.mask[index])
+        return [message for bit, message in ERROR_MESSAGES if bits & bit]
+
+
+def validate_batch(labels, amounts, dates):
+    # Column-wise version of validate_fields: each check runs once over the
+    # whole column. Columns may be lists or NumPy/Arrow arrays. Without
+    # NumPy it falls back to validating row by row.
+    if not len(labels) == len(amounts) == len(dates):
+        raise ValueError("Les colonnes doivent avoir la même longueur")
+    if not _numpy():
+        return BatchValidation([
+            _mask_from_errors(validate_fields(label, amount, date_str))
+            for label, amount, date_str in zip(labels, amounts, dates)
+        ])
+
+    mask = np.zeros(len(labels), dtype=np.uint8)
+    mask |= np.where(_empty_labels(labels), LABEL_EMPTY, 0).astype(np.uint8)
+    invalid, not_positive = _check_amounts(amounts)
+    mask |= np.where(invalid, AMOUNT_INVALID, 0).astype(np.uint8)
+    mask |= np.where(not_positive, AMOUNT_NOT_POSITIVE, 0).astype(np.uint8)
+    mask |= np.where(_invalid_dates(dates), DATE_INVALID, 0).astype(np.uint8)
+
+    # NumPy's fixed-width strings drop trailing NUL characters, which
+    # float() and strptime reject and str.strip() keeps: recheck those rows.
+    columns = [_sequence(column) for column in (labels, amounts, dates)]
+    for index in _rows_with_nul(columns):
+        mask[index] = _mask_from_errors(validate_fields(*(column[index] for column in columns)))
+    return BatchValidation(mask)
+
+
+def _numpy():
+    global np
+    if np is None:
+        try:
+            import numpy
+            np = numpy
+        except ImportError:
+            np = False
+    return np
+
+
+def _mask_from_errors(errors):
+    bits = 0
+    for bit, message in ERROR_MESSAGES:
+        if message in errors:
+            bits |= bit
+    return bits
+
+
+def _column(values):
+    # Arrow arrays convert through NumPy's array protocol.
+    if hasattr(values, "to_numpy"):
+        return np.asarray(values.to_numpy(zero_copy_only=False))
+    return np.asarray(values)
+
+
+def _sequence(values):
+    # Arrow arrays index to Arrow scalars; anything else is used as is.
+    if hasattr(values, "to_numpy"):
+        return values.to_numpy(zero_copy_only=False)
+    return values
+
+
+def _rows_with_nul(columns):
+    rows = set()
+    for values in columns:
+        if isinstance(values, np.ndarray) and values.dtype.kind != "O":
+            # Already NumPy strings or numbers, nothing left to lose.
+            continue
+        try:
+            if "\x00" not in "".join(values):
+                continue
+        except TypeError:
+            pass
+        rows.update(
+            index for index, value in enumerate(values)
+            if isinstance(value, str) and value.endswith("\x00")
+        )
+    return sorted(rows)
+
+
+def _empty_labels(labels):
+    labels = _column(labels).astype(str)
+    return np.char.str_len(np.char.strip(labels)) == 0
+
+
+def _check_amounts(amounts):
+    amounts = _column(amounts)
+    if amounts.dtype.kind in "biuf":
+        values = amounts.astype(np.float64)
+        return np.zeros(len(values), dtype=bool), values <= 0
+    try:
+        # NumPy's string-to-float cast accepts exactly what float() accepts.
+        values = amounts.astype(np.float64)
+        invalid = np.zeros(len(values), dtype=bool)
+    except (ValueError, TypeError):
+        values, invalid = _parse_amounts(amounts)
+    return invalid, ~invalid & (values <= 0)
+
+
+def _parse_amounts(amounts):
+    # Slow path, only for columns that contain at least one bad amount.
+    values = np.zeros(len(amounts), dtype=np.float64)
+    invalid = np.zeros(len(amounts), dtype=bool)
+    for index, amount in enumerate(amounts.tolist()):
+        try:
+            values[index] = float(amount)
+        except ValueError:
+            invalid[index] = True
+    return values, invalid
+
+
+def _invalid_dates(dates):
+    dates = _column(dates)
+    if dates.dtype.kind == "M":
+        return np.isnat(dates)
+
+    # Fast path for the canonical ASCII "YYYY-MM-DD" form: check the shape
+    # on the code points, then the calendar with integer arithmetic.
+    dates = dates.astype(str)
+    invalid = np.ones(len(dates), dtype=bool)
+    canonical = np.char.str_len(dates) == 10
+    if canonical.any():
+        points = dates[canonical].astype("U10").view(np.uint32).reshape(-1, 10)
+        digits = (points >= 48) & (points <= 57)
+        shape_ok = (
+            digits[:, [0, 1, 2, 3, 5, 6, 8, 9]].all(axis=1)
+            & (points[:, 4] == 45) & (points[:, 7] == 45)
+        )
+        values = points.astype(np.int64) - 48
+        year = values[:, 0] * 1000 + values[:, 1] * 100 + values[:, 2] * 10 + values[:, 3]
+        month = values[:, 5] * 10 + values[:, 6]
+        day = values[:, 8] * 10 + values[:, 9]
+        leap = (year % 4 == 0) & ((year % 100 != 0) | (year % 400 == 0))
+        month_days = np.array([0, 31, 28, 31, 30, 31, 30, 31, 31, 30, 31, 30, 31])
+        days = month_days[np.clip(month, 0, 12)] + ((month == 2) & leap)
+        calendar_ok = (year >= 1) & (month >= 1) & (month <= 12) & (day >= 1) & (day <= days)
+        canonical_rows = np.flatnonzero(canonical)
+        invalid[canonical_rows] = ~(shape_ok & calendar_ok)
+        # Rows with the right length but another shape still go to strptime.
+        canonical[canonical_rows[~shape_ok]] = False
+
+    # strptime also accepts forms like "2024-1-5"; check the rest one by one.
+    for index in np.flatnonzero(~canonical):
+        try:
+            datetime.strptime(dates[index], "%Y-%m-%d")
+            invalid[index] = False
+        except ValueError:
+            invalid[index] = True
+    return invalid
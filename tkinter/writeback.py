@@ -0,0 +1,150 @@
+import itertools
+import queue
+import threading
+import time
+
+DEFAULT_MAX_DELAY = 0.05
+DEFAULT_MAX_BATCH = 200
+
+
+class WriteBehindQueue:
+    # Mutations are queued in order and applied by a background thread.
+    # Whatever arrives within max_delay of the first queued mutation is
+    # grouped into one transaction through db.apply_mutations, so a burst of
+    # edits costs a single commit and no click waits for the disk.
+    #
+    # add() hands out a negative temporary id right away. Later mutations may
+    # use it; the worker maps it to the real id once the insert is done, and
+    # the mapping is reported through poll() so the UI can swap it in.
+
+    def __init__(self, db, max_delay=DEFAULT_MAX_DELAY, max_batch=DEFAULT_MAX_BATCH):
+        self.db = db
+        self.max_delay = max_delay
+        self.max_batch = max_batch
+        self.ids = {}
+        self.pending = 0
+        self._queue = queue.SimpleQueue()
+        self._events = queue.SimpleQueue()
+        self._temp_ids = itertools.count(-1, -1)
+        self._idle = threading.Condition()
+        self._urgent = threading.Event()
+        self._closed = False
+        self._thread = threading.Thread(target=self._run, name="expense-writer", daemon=True)
+        self._thread.start()
+
+    def add(self, label, amount, date):
+        temp_id = next(self._temp_ids)
+        self._submit("add", temp_id, (label, amount, date))
+        return temp_id
+
+    def update(self, expense_id, label, amount, date):
+        self._submit("update", expense_id, (label, amount, date))
+
+    def delete(self, expense_id):
+        self._submit("delete", expense_id, ())
+
+    def resolve(self, expense_id):
+        return self.ids.get(expense_id, expense_id)
+
+    def _submit(self, kind, expense_id, values):
+        if self._closed:
+            raise RuntimeError("La file d'écriture est fermée")
+        with self._idle:
+            self.pending += 1
+        self._queue.put((kind, expense_id, values))
+
+    def poll(self):
+        # Called on the Tk thread: ("flushed", {temp_id: id}) after each
+        # committed batch, ("error", exception) when a batch was rolled back.
+        events = []
+        while not self._events.empty():
+            events.append(self._events.get())
+        return events
+
+    def flush(self, timeout=None):
+        # Blocks until everything queued so far is committed or has failed.
+        self._urgent.set()
+        with self._idle:
+            done = self._idle.wait_for(lambda: self.pending == 0, timeout)
+        self._urgent.clear()
+        return done
+
+    def close(self, timeout=None):
+        if self._closed:
+            return True
+        done = self.flush(timeout)
+        self._closed = True
+        self._queue.put(None)
+        self._thread.join(timeout)
+        return done
+
+    def _run(self):
+        while True:
+            item = self._queue.get()
+            if item is None:
+                return
+            batch = [item]
+            stop = False
+            deadline = time.monotonic() + self.max_delay
+            while len(batch) < self.max_batch:
+                remaining = deadline - time.monotonic()
+                try:
+                    if remaining > 0 and not self._urgent.is_set():
+                        item = self._queue.get(timeout=remaining)
+                    else:
+                        item = self._queue.get_nowait()
+                except queue.Empty:
+                    break
+                if item is None:
+                    stop = True
+                    break
+                batch.append(item)
+            self._apply(batch)
+            if stop:
+                return
+
+    def _apply(self, batch):
+        try:
+            entries = self._coalesce(batch)
+            if entries:
+                new_ids = self.db.apply_mutations([
+                    (kind, (expense_id,) + values) if kind != "add" else (kind, values)
+                    for kind, expense_id, values in entries
+                ])
+                flushed = {
+                    expense_id: new_id
+                    for (kind, expense_id, values), new_id in zip(entries, new_ids)
+                    if kind == "add"
+                }
+                self.ids.update(flushed)
+                self._events.put(("flushed", flushed))
+        except Exception as error:
+            self._events.put(("error", error))
+        finally:
+            with self._idle:
+                self.pending -= len(batch)
+                self._idle.notify_all()
+
+    def _coalesce(self, batch):
+        # Edits to a row inserted in the same batch are folded into its
+        # insert (its id is not known yet); deleting it cancels both.
+        entries = []
+        added = {}
+        for kind, expense_id, values in batch:
+            if expense_id in added:
+                index = added[expense_id]
+                if kind == "update":
+                    entries[index] = ("add", expense_id, values)
+                else:
+                    entries[index] = None
+                    del added[expense_id]
+                continue
+            if kind == "add":
+                added[expense_id] = len(entries)
+            elif expense_id < 0:
+                if expense_id not in self.ids:
+                    # Its insert failed in an earlier batch; already reported.
+                    continue
+                expense_id = self.ids[expense_id]
+            entries.append((kind, expense_id, values))
+        return [entry for entry in entries if entry is not None]